@@ -1,7 +1,7 @@
 import aio_pika
 import asyncio
-import json
 from config import RABBITMQ_URL, ATTENDANCE_QUEUE
+from rabbitMQ.codec import decode, encode
 from controllers.attendance_controller import handle_attendance_message  # You will create this
 
 async def attendance_consume():
@@ -13,7 +13,7 @@ async def attendance_consume():
     async with queue.iterator() as queue_iter:
         async for message in queue_iter:
             async with message.process():
-                payload = json.loads(message.body.decode())
+                payload = decode(message.body, message.content_type)
 
                 action = payload.get("action")
                 data = payload.get("payload")
@@ -30,12 +30,14 @@ async def attendance_consume():
                 correlation_id = message.correlation_id
 
                 if reply_to and correlation_id:
+                    body, content_type = encode({
+                        "status": "success" if "error" not in result else "error",
+                        "result": result
+                    }, message.content_type)
                     await channel.default_exchange.publish(
                         aio_pika.Message(
-                            body=json.dumps({
-                                "status": "success" if "error" not in result else "error",
-                                "result": result
-                            }).encode(),
+                            body=body,
+                            content_type=content_type,
                             correlation_id=correlation_id
                         ),
                         routing_key=reply_to
@@ -1,6 +1,27 @@
-from app.services.courses import get_enrolled_courses, get_eligible_courses, get_assigned_courses, get_all_courses, add_new_course, get_all_courses_yet_to_assign, get_eligible_courses_yet_to_enroll
-from app.services.enrollments import enroll, unenroll
+import asyncio
+from app.services.courses import get_enrolled_courses, get_eligible_courses, get_assigned_courses, get_all_courses, add_new_course, add_courses, get_all_courses_yet_to_assign, get_eligible_courses_yet_to_enroll
+from app.services.enrollments import enroll, enroll_many, unenroll
 from app.services.lecturers import get_lecturers
+from app.services.dashboard import get_student_dashboard
+from app.controllers.single_flight import SingleFlight, request_key
+
+# Read-only actions: identical concurrent requests share one backend call
+READ_ACTIONS = {
+    "getEnrolledCourses",
+    "getEligibleCourses",
+    "getEligibleCoursesYetToEnroll",
+    "getAssignedCourses",
+    "getAllCourses",
+    "getAllCoursesYetToAssign",
+    "getLecturers",
+    "getStudentDashboard",
+}
+
+single_flight = SingleFlight()
+
+# Messages are handled as concurrent tasks, but only reads overlap: writes run one
+# at a time, in arrival order, so their check-then-write steps never interleave
+write_lock = asyncio.Lock()
 
 async def handle_message(payload: dict):
 
@@ -10,6 +31,12 @@ async def handle_message(payload: dict):
     print(f"Received action: {action}")
     print(f"Received data: {data}")
 
+    if action in READ_ACTIONS:
+        return await single_flight.do(request_key(action, data), lambda: dispatch(action, data))
+    async with write_lock:
+        return await dispatch(action, data)
+
+async def dispatch(action: str, data: dict):
     if action == "getEnrolledCourses":
         result = await get_enrolled_courses(data)
         return result
@@ -19,6 +46,9 @@ async def handle_message(payload: dict):
     elif action == "getEligibleCoursesYetToEnroll":
         result = await get_eligible_courses_yet_to_enroll(data)
         return result
+    elif action == "getStudentDashboard":
+        result = await get_student_dashboard(data)
+        return result
     elif action == "getAssignedCourses":
         result = await get_assigned_courses(data)
         return result
@@ -31,6 +61,9 @@ async def handle_message(payload: dict):
     elif action == "enrollInCourse":
         result = await enroll(data)
         return result
+    elif action == "enrollMany":
+        result = await enroll_many(data)
+        return result
     elif action == "unenrollFromCourse":
         result = await unenroll(data)
         return result
@@ -40,5 +73,8 @@ async def handle_message(payload: dict):
     elif action == "addNewCourse":
         result = await add_new_course(data)
         return result
+    elif action == "addCourses":
+        result = await add_courses(data)
+        return result
     else:
         return {"error": "Invalid action"}
\ No newline at end of file
@@ -1,12 +1,14 @@
 from fastapi import FastAPI
 import asyncio
 from app.rabbitmq.consumer import consume
+from app.rabbitmq.outbox import outbox
 
 app = FastAPI()
 
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(consume())
+    asyncio.create_task(outbox.relay())
 
 @app.get("/")
 async def root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Literal
+from typing import Literal, Optional
 import datetime
 
 # Allowed departments (full names only)
@@ -34,6 +34,7 @@ class AddCourseRequestModel(BaseModel):
     day_of_week: DAYS_OF_WEEK
     start_time: datetime.time
     lecturer_reg_numbers: list[str]
+    capacity: Optional[int] = Field(None, ge=1)  # seat limit, None for unlimited
 
     @validator('department')
     def validate_department(cls, v):
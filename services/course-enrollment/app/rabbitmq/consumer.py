@@ -1,42 +1,55 @@
 import aio_pika
 import asyncio
-import json
-from app.config import RABBITMQ_URL, COURSES_QUEUE
+from app.config import RABBITMQ_URL, COURSES_QUEUE, CONSUMER_PREFETCH_COUNT
+from app.rabbitmq.codec import decode, encode
 from app.controllers.course_controller import handle_message
 
+# Keep references to in-flight handlers so they are not garbage collected
+_tasks: set[asyncio.Task] = set()
+
 async def consume():
     connection = await aio_pika.connect_robust(RABBITMQ_URL)
     channel = await connection.channel()
+    # Handle up to CONSUMER_PREFETCH_COUNT messages concurrently (writes are still
+    # serialised by the controller)
+    await channel.set_qos(prefetch_count=CONSUMER_PREFETCH_COUNT)
     queue = await channel.declare_queue(COURSES_QUEUE, durable=True)
     print("✅ Consumer started, waiting for messages...")
 
     async with queue.iterator() as queue_iter:
         async for message in queue_iter:
-            async with message.process():
-                payload = json.loads(message.body.decode())
-
-                # Process message
-                response = await handle_message(payload)
-
-                # Correctly access reply-to and correlation-id
-                reply_to = message.reply_to
-                correlation_id = message.correlation_id
-
-                print(f"response: {response}")
-                print(f"reply queue: {reply_to}")
-                print(f"correlation id: {correlation_id}")
-
-                # Reply only if required
-                if reply_to and correlation_id:
-                    await channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=json.dumps({
-                                "status": "success",
-                                "result": response
-                            }).encode(),
-                            correlation_id=correlation_id
-                        ),
-                        routing_key=reply_to
-                    )
-
-                print("✅ Response sent back, message acked.")
+            task = asyncio.create_task(process_message(channel, message))
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+async def process_message(channel: aio_pika.abc.AbstractChannel, message: aio_pika.abc.AbstractIncomingMessage):
+    async with message.process():
+        payload = decode(message.body, message.content_type)
+
+        # Process message
+        response = await handle_message(payload)
+
+        # Correctly access reply-to and correlation-id
+        reply_to = message.reply_to
+        correlation_id = message.correlation_id
+
+        print(f"response: {response}")
+        print(f"reply queue: {reply_to}")
+        print(f"correlation id: {correlation_id}")
+
+        # Reply only if required
+        if reply_to and correlation_id:
+            body, content_type = encode({
+                "status": "success",
+                "result": response
+            }, message.content_type)
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=body,
+                    content_type=content_type,
+                    correlation_id=correlation_id
+                ),
+                routing_key=reply_to
+            )
+
+        print("✅ Response sent back, message acked.")
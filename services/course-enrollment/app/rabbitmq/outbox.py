@@ -0,0 +1,181 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from app.config import OUTBOX_DB_PATH, OUTBOX_RETRY_BASE_SECONDS, OUTBOX_RETRY_MAX_SECONDS
+from app.rabbitmq.codec import decode, encode
+from app.rabbitmq.rabbitMQ_service import publish_message
+
+HELD = "held"
+READY = "ready"
+
+class Outbox:
+    """
+    Durable queue of messages to publish around a database write.
+
+    `hold()` stores the encoded message in a local SQLite file *before* the write, so
+    a crash between the write and the publish cannot lose it; `release()` makes it
+    publishable once the write has succeeded and `discard()` drops it if it failed.
+    `relay()` runs in the background, publishes ready messages (fire-and-forget,
+    persistent delivery) and retries failed ones with exponential backoff.
+
+    Messages still held when the relay starts were left by a process that stopped
+    mid-write. Each is passed to the recoverer registered for its kind, which checks
+    the database and returns the payload to publish (or None to drop it), so
+    recovery can safely run again after another crash. A message is removed only
+    after it has been published; a crash between the publish and the removal
+    publishes it again with the same AMQP message id, so delivery is at-least-once.
+
+    The SQLite calls run in worker threads so they never block the event loop.
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                queue_name TEXT NOT NULL,
+                body BLOB NOT NULL,
+                content_type TEXT NOT NULL,
+                kind TEXT,
+                state TEXT NOT NULL DEFAULT 'ready',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+        # Outbox files created before messages could be held lack these columns
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+        if "kind" not in columns:
+            self._db.execute("ALTER TABLE outbox ADD COLUMN kind TEXT")
+        if "state" not in columns:
+            self._db.execute("ALTER TABLE outbox ADD COLUMN state TEXT NOT NULL DEFAULT 'ready'")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._recoverers = {}
+        self._wakeup = asyncio.Event()
+
+    def recoverer(self, kind: str):
+        """
+        Register the recoverer for held messages of `kind`: an async function taking
+        the held payload and returning the payload to publish, or None to drop it.
+        """
+        def register(func):
+            self._recoverers[kind] = func
+            return func
+        return register
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+
+    async def _run(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    async def hold(self, queue_name: str, payload: dict, kind: str) -> int:
+        """
+        Store a message that is not published until it is released. Returns its id.
+        """
+        body, content_type = encode(payload)
+        rows = await self._run(
+            "INSERT INTO outbox (queue_name, body, content_type, kind, state, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) RETURNING id",
+            (queue_name, body, content_type, kind, HELD, time.time()),
+        )
+        return rows[0][0]
+
+    async def release(self, message_id: int, payload: dict | None = None):
+        """
+        Make a held message publishable, replacing its payload if one is given.
+        """
+        if payload is None:
+            await self._run(
+                "UPDATE outbox SET state = ?, next_attempt_at = ? WHERE id = ?",
+                (READY, time.time(), message_id),
+            )
+        else:
+            body, content_type = encode(payload)
+            await self._run(
+                "UPDATE outbox SET state = ?, body = ?, content_type = ?, next_attempt_at = ? WHERE id = ?",
+                (READY, body, content_type, time.time(), message_id),
+            )
+        self._wakeup.set()
+
+    async def discard(self, message_id: int):
+        await self._run("DELETE FROM outbox WHERE id = ?", (message_id,))
+
+    async def add(self, queue_name: str, payload: dict):
+        """
+        Store a message that is publishable straight away.
+        """
+        body, content_type = encode(payload)
+        await self._run(
+            "INSERT INTO outbox (queue_name, body, content_type, state, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+            (queue_name, body, content_type, READY, time.time()),
+        )
+        self._wakeup.set()
+
+    async def _recover(self):
+        held = await self._run(
+            "SELECT id, kind, body, content_type FROM outbox WHERE state = ? ORDER BY id", (HELD,)
+        )
+        for message_id, kind, body, content_type in held:
+            recover = self._recoverers.get(kind)
+            if recover is None:
+                print(f"⚠️ Outbox message {message_id} held with no recoverer for {kind!r}; left in place")
+                continue
+            try:
+                payload = await recover(decode(body, content_type))
+            except Exception as e:
+                print(f"⚠️ Outbox message {message_id} not recovered: {e}; retried on next start")
+                continue
+            if payload is None:
+                await self.discard(message_id)
+            else:
+                await self.release(message_id, payload)
+        if held:
+            print(f"✅ Outbox recovered {len(held)} held message(s)")
+
+    async def _due(self, limit: int = 100) -> list[tuple]:
+        return await self._run(
+            "SELECT id, queue_name, body, content_type, attempts FROM outbox "
+            "WHERE state = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (READY, time.time(), limit),
+        )
+
+    async def _next_due_in(self) -> float | None:
+        rows = await self._run("SELECT MIN(next_attempt_at) FROM outbox WHERE state = ?", (READY,))
+        if rows[0][0] is None:
+            return None
+        return max(0.0, rows[0][0] - time.time())
+
+    async def relay(self):
+        print("✅ Outbox relay started...")
+        await self._recover()
+        while True:
+            self._wakeup.clear()
+            for message_id, queue_name, body, content_type, attempts in await self._due():
+                try:
+                    await publish_message(queue_name, body, content_type, message_id=f"outbox-{message_id}")
+                except Exception as e:
+                    delay = min(OUTBOX_RETRY_BASE_SECONDS * 2 ** attempts, OUTBOX_RETRY_MAX_SECONDS)
+                    print(f"⚠️ Outbox message {message_id} not published (attempt {attempts + 1}): {e}")
+                    await self._run(
+                        "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                        (time.time() + delay, str(e), message_id),
+                    )
+                else:
+                    await self.discard(message_id)
+
+            # Sleep until the next retry is due or a message is released
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=await self._next_due_in())
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox = Outbox(OUTBOX_DB_PATH)
@@ -1,10 +1,10 @@
 import asyncio
-import json
 import uuid
 import aio_pika
 from aio_pika import Message, connect_robust
 from aio_pika.abc import AbstractChannel, AbstractConnection
 from app.config import RABBITMQ_URL
+from app.rabbitmq.codec import decode, encode, JSON_CONTENT_TYPE
 
 connection: AbstractConnection = None
 channel: AbstractChannel = None
@@ -17,7 +17,7 @@ async def initialize_rabbitmq():
 # Call once on app startup
 asyncio.create_task(initialize_rabbitmq())
 
-async def publish_message_with_reply(queue_name: str, payload: dict, timeout: int = 5):
+async def publish_message_with_reply(queue_name: str, payload: dict, timeout: int = 5, content_type: str = JSON_CONTENT_TYPE):
     if not channel:
         raise RuntimeError("RabbitMQ channel not initialized")
 
@@ -30,16 +30,17 @@ async def publish_message_with_reply(queue_name: str, payload: dict, timeout: in
 
     async def on_message(message: aio_pika.IncomingMessage):
         if message.correlation_id == correlation_id:
-            future.set_result(json.loads(message.body.decode()))
+            future.set_result(decode(message.body, message.content_type))
             await message.ack()
 
     await reply_queue.consume(on_message, no_ack=False)
 
+    body, content_type = encode(payload, content_type)
     message = Message(
-        body=json.dumps(payload).encode(),
+        body=body,
         correlation_id=correlation_id,
         reply_to=reply_queue.name,
-        content_type='application/json'
+        content_type=content_type
     )
 
     await channel.default_exchange.publish(
@@ -50,3 +51,21 @@ async def publish_message_with_reply(queue_name: str, payload: dict, timeout: in
         return await asyncio.wait_for(future, timeout=timeout)
     except asyncio.TimeoutError:
         raise TimeoutError("Request timed out")
+
+async def publish_message(queue_name: str, body: bytes, content_type: str = JSON_CONTENT_TYPE, message_id: str | None = None):
+    """
+    Publish a persistent message without waiting for a reply. A stable `message_id`
+    lets consumers recognise a message that is published again after a retry.
+    """
+    if not channel:
+        raise RuntimeError("RabbitMQ channel not initialized")
+
+    await channel.default_exchange.publish(
+        Message(
+            body=body,
+            content_type=content_type,
+            message_id=message_id,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        ),
+        routing_key=queue_name
+    )
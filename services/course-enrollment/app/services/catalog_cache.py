@@ -0,0 +1,111 @@
+import asyncio
+import time
+from app.supabase.supabaseClient import supabase
+from app.config import CATALOG_CACHE_TTL_SECONDS
+
+class CatalogCache:
+    """
+    In-process copy of the course catalogue, lecturer list and course assignments.
+
+    Entries expire after `ttl` seconds and are dropped immediately by `invalidate()`,
+    which the write paths (add_new_course, assign_course_to_lecturer) call.
+    Courses are indexed by course_code, by (year, semester) and by semester.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._lock = asyncio.Lock()
+        self._courses: list[dict] | None = None
+        self._by_code: dict[str, dict] = {}
+        self._by_term: dict[tuple, list[dict]] = {}
+        self._by_semester: dict[int, list[dict]] = {}
+        self._courses_loaded_at = 0.0
+        self._lecturers: list[dict] | None = None
+        self._lecturers_loaded_at = 0.0
+        self._assigned: dict[str, list[str]] | None = None
+        self._assigned_loaded_at = 0.0
+
+    def _expired(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at > self.ttl
+
+    async def _ensure_courses(self):
+        if self._courses is not None and not self._expired(self._courses_loaded_at):
+            return
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._courses is not None and not self._expired(self._courses_loaded_at):
+                return
+            version = self.version
+            response = await asyncio.to_thread(
+                supabase
+                .from_("Courses")
+                .select("*")
+                .execute
+            )
+            self._index_courses(response.data)
+            # If invalidated while loading, serve these rows once but reload on the next call
+            self._courses_loaded_at = time.monotonic() if version == self.version else 0.0
+
+    def _index_courses(self, courses: list[dict]):
+        by_code, by_term, by_semester = {}, {}, {}
+        for course in courses:
+            by_code[course["course_code"]] = course
+            by_term.setdefault((course.get("year"), course.get("semester")), []).append(course)
+            by_semester.setdefault(course.get("semester"), []).append(course)
+        self._courses, self._by_code, self._by_term, self._by_semester = courses, by_code, by_term, by_semester
+
+    async def courses(self) -> list[dict]:
+        await self._ensure_courses()
+        return self._courses
+
+    async def course(self, course_code: str) -> dict | None:
+        await self._ensure_courses()
+        return self._by_code.get(course_code)
+
+    async def courses_for_term(self, year: int, semester: int) -> list[dict]:
+        await self._ensure_courses()
+        return self._by_term.get((year, semester), [])
+
+    async def courses_for_semester(self, semester: int) -> list[dict]:
+        await self._ensure_courses()
+        return self._by_semester.get(semester, [])
+
+    async def lecturers(self) -> list[dict]:
+        if self._lecturers is None or self._expired(self._lecturers_loaded_at):
+            response = await asyncio.to_thread(
+                supabase
+                .from_("faculty_member_profiles")
+                .select("*")
+                .execute
+            )
+            self._lecturers = response.data
+            self._lecturers_loaded_at = time.monotonic()
+        return self._lecturers
+
+    async def lecturers_for_course(self, course_code: str) -> list[str]:
+        if self._assigned is None or self._expired(self._assigned_loaded_at):
+            response = await asyncio.to_thread(
+                supabase
+                .from_("Assigned")
+                .select("course_code, lecturer_reg_number")
+                .execute
+            )
+            assigned = {}
+            for row in response.data:
+                assigned.setdefault(row["course_code"], []).append(row["lecturer_reg_number"])
+            self._assigned = assigned
+            self._assigned_loaded_at = time.monotonic()
+        return self._assigned.get(course_code, [])
+
+    def invalidate(self):
+        self.version += 1
+        self._courses = None
+        self._courses_loaded_at = 0.0
+        self._lecturers = None
+        self._lecturers_loaded_at = 0.0
+        self._assigned = None
+        self._assigned_loaded_at = 0.0
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_TTL_SECONDS)
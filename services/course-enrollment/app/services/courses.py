@@ -1,16 +1,20 @@
+import asyncio
 from app.supabase.supabaseClient import supabase
-from app.services.lecturers import assign_course_to_lecturer
+from app.services.catalog_cache import catalog_cache
+from app.services.enrollments import seat_ledger
 from app.models.course_models import AddCourseRequestModel
+from pydantic import ValidationError
+from app.rabbitmq.codec import jsonable
 
 async def get_enrolled_courses(data: dict):
     reg_number = data.get("reg_number")
     try:
-        response = (
+        response = await asyncio.to_thread(
             supabase
             .from_("Enrollments")
             .select("Courses(*)")
             .eq("reg_number", reg_number)
-            .execute()
+            .execute
         )
 
         # if response.error:
@@ -29,13 +33,13 @@ async def get_eligible_courses(data: dict):
     reg_number = data.get("reg_number")
     try:
         # Step 1: Get student's semester
-        student_response = (
+        student_response = await asyncio.to_thread(
             supabase
             .from_("Student profiles")
             .select("semester")
             .eq("reg_number", reg_number)
             .single()
-            .execute()
+            .execute
         )
 
         # if student_response:
@@ -44,20 +48,11 @@ async def get_eligible_courses(data: dict):
         semester = student_response.data["semester"]
         print(f"🎓 Student Semester: {semester}")
 
-        # Step 2: Get eligible courses for that semester
-        courses_response = (
-            supabase
-            .from_("Courses")
-            .select("*")
-            .eq("semester", semester)
-            .execute()
-        )
-
-        # if courses_response:
-        #     raise Exception(f"Failed to fetch courses: {courses_response.error}")
+        # Step 2: Get eligible courses for that semester (served from the catalogue cache)
+        eligible_courses = await catalog_cache.courses_for_semester(semester)
 
-        print(f"✅ Eligible Courses: {courses_response.data}")
-        return courses_response.data
+        print(f"✅ Eligible Courses: {len(eligible_courses)}")
+        return eligible_courses
     
 
     except Exception as e:
@@ -67,13 +62,13 @@ async def get_eligible_courses_yet_to_enroll(data: dict):
     reg_number = data.get("reg_number")
     try:
         # Step 1: Get student's semester
-        student_response = (
+        student_response = await asyncio.to_thread(
             supabase
             .from_("Student profiles")
             .select("semester", "year")
             .eq("reg_number", reg_number)
             .single()
-            .execute()
+            .execute
         )
 
         # if student_response:
@@ -83,41 +78,29 @@ async def get_eligible_courses_yet_to_enroll(data: dict):
         year = student_response.data["year"]
         print(f"🎓 Student Year: {year} Semester: {semester}")
 
-        # Step 2: Get eligible courses for that semester and year
-        courses_response = (
-            supabase
-            .from_("Courses")
-            .select("*")
-            .eq("year", year)
-            .eq("semester", semester)
-            .execute()
-        )
-
-        # if courses_response:
-        #     raise Exception(f"Failed to fetch courses: {courses_response.error}")
+        # Step 2: Get eligible courses for that semester and year (served from the catalogue cache)
+        eligible_courses = await catalog_cache.courses_for_term(year, semester)
 
-        eligible_courses = courses_response.data
-
-        # Step 3: Get already enrolled courses
-        enrolled_courses_response = (
+        # Step 3: Get the codes of already enrolled courses
+        enrolled_courses_response = await asyncio.to_thread(
             supabase
             .from_("Enrollments")
-            .select("Courses(*)")
+            .select("course_code")
             .eq("reg_number", reg_number)
-            .execute()
+            .execute
         )
 
         # if enrolled_courses_response:
         #     raise Exception(f"Failed to fetch enrolled courses: {enrolled_courses_response.error}")
 
-        enrolled_courses = [row["Courses"] for row in enrolled_courses_response.data if "Courses" in row]
+        enrolled_course_codes = {row["course_code"] for row in enrolled_courses_response.data}
 
         # Step 4: Filter out already enrolled courses from eligible courses
         eligible_courses_yet_to_enroll = [
-            course for course in eligible_courses if course not in enrolled_courses
+            course for course in eligible_courses if course["course_code"] not in enrolled_course_codes
         ]
 
-        print(f"✅ Eligible Courses Yet to Enroll: {eligible_courses_yet_to_enroll}")
+        print(f"✅ Eligible Courses Yet to Enroll: {len(eligible_courses_yet_to_enroll)}")
         return eligible_courses_yet_to_enroll
 
     except Exception as e:
@@ -126,12 +109,12 @@ async def get_eligible_courses_yet_to_enroll(data: dict):
 async def get_assigned_courses(data: dict):
     reg_number = data.get("reg_number")
     try:
-        response = (
+        response = await asyncio.to_thread(
             supabase
             .from_("Assigned")
             .select("Courses(*)")
             .eq("lecturer_reg_number", reg_number)
-            .execute()
+            .execute
         )
 
         # if response.error:
@@ -148,63 +131,78 @@ async def get_assigned_courses(data: dict):
     
 async def get_all_courses():
     try:
-        response = (
-            supabase
-            .from_("Courses")
-            .select("*")
-            .execute()
-        )
-
-        # if response.error:
-        #     raise Exception(f"Error fetching all courses: {response.status_code} - {response.error}")
+        all_courses = await catalog_cache.courses()
 
-        print(f"✅ All Courses: {response.data}")
-        return response.data
+        print(f"✅ All Courses: {len(all_courses)}")
+        return all_courses
     except Exception as e: 
         raise Exception(f"An error occurred while fetching all courses: {str(e)}")
     
 async def get_all_courses_yet_to_assign(data: dict):
     reg_number = data.get("reg_number")
     try:
-        # Step 1: Get all courses
-        all_courses_response = (
-            supabase
-            .from_("Courses")
-            .select("*")
-            .execute()
-        )
-
-        # if all_courses_response.error:
-        #     raise Exception(f"Error fetching all courses: {all_courses_response.status_code} - {all_courses_response.error}")
+        # Step 1: Get all courses (served from the catalogue cache)
+        all_courses = await catalog_cache.courses()
 
-        all_courses = all_courses_response.data
-
-        # Step 2: Get already assigned courses
-        assigned_courses_response = (
+        # Step 2: Get the codes of already assigned courses
+        assigned_courses_response = await asyncio.to_thread(
             supabase
             .from_("Assigned")
-            .select("Courses(*)")
+            .select("course_code")
             .eq("lecturer_reg_number", reg_number)
-            .execute()
+            .execute
         )
 
         # if assigned_courses_response.error:
         #     raise Exception(f"Error fetching assigned courses: {assigned_courses_response.status_code} - {assigned_courses_response.error}")
 
-        assigned_courses = [row["Courses"] for row in assigned_courses_response.data if "Courses" in row]
+        assigned_course_codes = {row["course_code"] for row in assigned_courses_response.data}
 
         # Step 3: Filter out already assigned courses from all courses
         courses_yet_to_assign = [
-            course for course in all_courses if course not in assigned_courses
+            course for course in all_courses if course["course_code"] not in assigned_course_codes
         ]
 
-        print(f"✅ Courses Yet to Assign: {courses_yet_to_assign}")
+        print(f"✅ Courses Yet to Assign: {len(courses_yet_to_assign)}")
         return courses_yet_to_assign
 
     except Exception as e:
         raise Exception(f"An error occurred while fetching courses yet to assign: {str(e)}")
     
     
+async def insert_courses_with_lecturers(courses: list[dict], assignments: list[tuple[str, str]]):
+    """
+    Insert courses and their (course_code, lecturer_reg_number) assignments in one
+    transaction (add_courses_with_lecturers, migrations/002): either every row is
+    written or none is.
+    """
+    await asyncio.to_thread(
+        supabase
+        .rpc("add_courses_with_lecturers", {
+            "courses": courses,
+            "assignments": [
+                {"course_code": course_code, "lecturer_reg_number": lecturer_reg_number}
+                for course_code, lecturer_reg_number in assignments
+            ],
+        })
+        .execute
+    )
+
+async def unknown_lecturers(reg_numbers) -> list[str]:
+    """The reg_numbers that are not faculty members, checked with one set query."""
+    reg_numbers = list(dict.fromkeys(reg_numbers))
+    if not reg_numbers:
+        return []
+    response = await asyncio.to_thread(
+        supabase
+        .from_("faculty_member_profiles")
+        .select("reg_number")
+        .in_("reg_number", reg_numbers)
+        .execute
+    )
+    known = {row["reg_number"] for row in response.data}
+    return [reg for reg in reg_numbers if reg not in known]
+
 async def add_new_course(data: dict):
     # course_code = data.get("course_code")
     # course_name = data.get("course_name")
@@ -225,6 +223,7 @@ async def add_new_course(data: dict):
     day_of_week = add_new_course_request.day_of_week
     start_time = add_new_course_request.start_time
     lecturer_reg_numbers = add_new_course_request.lecturer_reg_numbers
+    capacity = add_new_course_request.capacity
 
 
 
@@ -242,33 +241,111 @@ async def add_new_course(data: dict):
         if existing_course.data:
             return {"message": "Course already exists."}
 
+        unknown = await unknown_lecturers(lecturer_reg_numbers)
+        if unknown:
+            return {"message": f"Unknown lecturers: {unknown}"}
+
         print(f"Adding new course {course_code} - {course_name} for semester {semester}")
-        # Add the new course
-        response = (
-            supabase
-            .from_("Courses")
-            .insert({
-                "course_code": course_code, 
-                "course_name": course_name, 
-                "course_description": course_description,
-                "year": year,
-                "semester": semester,
-                "credits": credits,
-                "day_of_week": day_of_week,
-                "start_time": start_time,
-                })
-            .execute()
+        new_course = {
+            "course_code": course_code, 
+            "course_name": course_name, 
+            "course_description": course_description,
+            "year": year,
+            "semester": semester,
+            "credits": credits,
+            "day_of_week": day_of_week,
+            "start_time": start_time,
+            }
+        if capacity is not None:
+            new_course["capacity"] = capacity
+
+        # Add the new course and assign it to its lecturers in one transaction
+        print(f"Assigning course {course_code} to lecturers {lecturer_reg_numbers}")
+        await insert_courses_with_lecturers(
+            [jsonable(new_course)],
+            [(course_code, reg) for reg in dict.fromkeys(lecturer_reg_numbers)],
         )
 
-        # if response.error:
-        #     raise Exception(f"Error adding new course: {response.status_code} - {response.error}")
-
-        # Assign the course to the lecturer
-        for lecturer_reg_number in lecturer_reg_numbers:
-            print(f"Assigning course {course_code} to lecturer {lecturer_reg_number}")
-            await assign_course_to_lecturer(course_code, lecturer_reg_number)
+        catalog_cache.invalidate()
+        # A request for the course before it existed cached it with no capacity
+        seat_ledger.invalidate(course_code)
 
         return {"message": "Successfully added new course."}
 
     except Exception as e:
-        raise Exception(f"An error occurred while adding new course: {str(e)}")
\ No newline at end of file
+        raise Exception(f"An error occurred while adding new course: {str(e)}")
+
+async def add_courses(data: dict):
+    """
+    Bulk version of add_new_course for importing a semester catalogue.
+    Course codes and lecturers are validated with one set query each, then all
+    courses and all Assigned rows are inserted in one transaction. Returns a
+    per-course result; rejected courses do not block the others, and if the insert
+    fails every course in it is reported as an error (nothing is written).
+    """
+    results = {}
+    requests = []
+    for index, course in enumerate(data.get("courses", [])):
+        try:
+            request = AddCourseRequestModel(**course)
+        except ValidationError as ve:
+            results[f"#{index}"] = {"course_code": course.get("course_code"), "status": "invalid", "message": str(ve)}
+            continue
+        if request.course_code in results:
+            results[f"#{index}"] = {"course_code": request.course_code, "status": "duplicate", "message": "Course code repeated in request."}
+            continue
+        results[request.course_code] = None
+        requests.append(request)
+
+    try:
+        course_codes = [r.course_code for r in requests]
+        lecturer_reg_numbers = list({reg for r in requests for reg in r.lecturer_reg_numbers})
+
+        existing_courses = set()
+        if course_codes:
+            existing_response = await asyncio.to_thread(
+                supabase
+                .from_("Courses")
+                .select("course_code")
+                .in_("course_code", course_codes)
+                .execute
+            )
+            existing_courses = {row["course_code"] for row in existing_response.data}
+
+        unknown_lecturer_set = set(await unknown_lecturers(lecturer_reg_numbers))
+
+        new_courses = []
+        assignments = []
+        for r in requests:
+            unknown = [reg for reg in r.lecturer_reg_numbers if reg in unknown_lecturer_set]
+            if r.course_code in existing_courses:
+                results[r.course_code] = {"course_code": r.course_code, "status": "exists", "message": "Course already exists."}
+            elif unknown:
+                results[r.course_code] = {"course_code": r.course_code, "status": "invalid", "message": f"Unknown lecturers: {unknown}"}
+            else:
+                new_course = jsonable(r.dict(exclude={"lecturer_reg_numbers", "department", "capacity"}))
+                if r.capacity is not None:
+                    new_course["capacity"] = r.capacity
+                new_courses.append(new_course)
+                assignments += [(r.course_code, reg) for reg in dict.fromkeys(r.lecturer_reg_numbers)]
+
+        if new_courses:
+            print(f"Adding {len(new_courses)} new courses")
+            try:
+                await insert_courses_with_lecturers(new_courses, assignments)
+            except Exception as e:
+                # The transaction rolled back: none of these courses were added
+                for course in new_courses:
+                    results[course["course_code"]] = {"course_code": course["course_code"], "status": "error", "message": str(e)}
+            else:
+                for course in new_courses:
+                    results[course["course_code"]] = {"course_code": course["course_code"], "status": "added", "message": "Successfully added new course."}
+                catalog_cache.invalidate()
+                for course in new_courses:
+                    seat_ledger.invalidate(course["course_code"])
+
+        added = sum(1 for result in results.values() if result["status"] == "added")
+        return {"message": f"Added {added} of {len(results)} courses.", "results": list(results.values())}
+
+    except Exception as e:
+        raise Exception(f"An error occurred while adding courses: {str(e)}")
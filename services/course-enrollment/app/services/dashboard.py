@@ -0,0 +1,98 @@
+import asyncio
+import time
+from app.supabase.supabaseClient import supabase
+from app.services.catalog_cache import catalog_cache
+from app.config import DASHBOARD_CACHE_TTL_SECONDS
+
+class StudentSnapshotCache:
+    """
+    Per-student dashboard snapshots.
+
+    A snapshot is dropped when it is older than `ttl` seconds, when the student
+    enrolls or unenrolls (`invalidate(reg_number)`), or when the course catalogue
+    it was built from has changed since (catalogue version mismatch).
+
+    `invalidate()` also bumps the student's generation; a build started before that
+    passes the old generation to `put()` and is not stored, so a snapshot read
+    before an enrolment change cannot be cached after it.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshots: dict[str, tuple[int, float, dict]] = {}
+        self._generations: dict[str, int] = {}
+
+    def get(self, reg_number: str) -> dict | None:
+        entry = self._snapshots.get(reg_number)
+        if entry is None:
+            return None
+        catalog_version, built_at, snapshot = entry
+        if catalog_version != catalog_cache.version or time.monotonic() - built_at > self.ttl:
+            del self._snapshots[reg_number]
+            return None
+        return snapshot
+
+    def generation(self, reg_number: str) -> int:
+        return self._generations.get(reg_number, 0)
+
+    def put(self, reg_number: str, catalog_version: int, generation: int, snapshot: dict):
+        if generation != self.generation(reg_number):
+            return
+        self._snapshots[reg_number] = (catalog_version, time.monotonic(), snapshot)
+
+    def invalidate(self, reg_number: str):
+        self._snapshots.pop(reg_number, None)
+        self._generations[reg_number] = self.generation(reg_number) + 1
+
+
+dashboard_cache = StudentSnapshotCache(DASHBOARD_CACHE_TTL_SECONDS)
+
+async def get_student_dashboard(data: dict):
+    """
+    Enrolled, eligible and eligible-yet-to-enroll courses for a student in one call.
+    The student's year/semester and enrolled course codes come from one embedded
+    query; course rows come from the catalogue cache.
+    """
+    reg_number = data.get("reg_number")
+    try:
+        snapshot = dashboard_cache.get(reg_number)
+        if snapshot is not None:
+            return snapshot
+
+        catalog_version = catalog_cache.version
+        generation = dashboard_cache.generation(reg_number)
+        student_response = await asyncio.to_thread(
+            supabase
+            .from_("Student profiles")
+            .select("year, semester, Enrollments(course_code)")
+            .eq("reg_number", reg_number)
+            .single()
+            .execute
+        )
+
+        year = student_response.data["year"]
+        semester = student_response.data["semester"]
+        enrolled_course_codes = [row["course_code"] for row in student_response.data.get("Enrollments") or []]
+        print(f"🎓 Student Year: {year} Semester: {semester}")
+
+        enrolled_courses = []
+        for course_code in enrolled_course_codes:
+            course = await catalog_cache.course(course_code)
+            if course is not None:
+                enrolled_courses.append(course)
+
+        enrolled = set(enrolled_course_codes)
+        snapshot = {
+            "enrolled_courses": enrolled_courses,
+            "eligible_courses": await catalog_cache.courses_for_semester(semester),
+            "eligible_courses_yet_to_enroll": [
+                course for course in await catalog_cache.courses_for_term(year, semester)
+                if course["course_code"] not in enrolled
+            ],
+        }
+
+        dashboard_cache.put(reg_number, catalog_version, generation, snapshot)
+        return snapshot
+
+    except Exception as e:
+        raise Exception(f"An error occurred while fetching the student dashboard: {str(e)}")
@@ -1,79 +1,270 @@
+import asyncio
 from app.supabase.supabaseClient import supabase
-from app.rabbitmq.rabbitMQ_service import publish_message_with_reply
-from app.config import COURSES_NOTIFICATIONS_QUEUE
+from app.rabbitmq.outbox import outbox
+from app.services.catalog_cache import catalog_cache
+from app.services.dashboard import dashboard_cache
+from app.services.seats import SeatLedger, RESERVED, ALREADY_ENROLLED, COURSE_FULL
+from app.config import COURSES_NOTIFICATIONS_QUEUE, SEAT_LEDGER_TTL_SECONDS, ENROLLMENT_PAGE_SIZE
+
+ENROLLMENT_NOTIFICATIONS = "enrollment_notifications"
+
+def select_all(build_query) -> list[dict]:
+    """
+    Every row of a select, read in pages of ENROLLMENT_PAGE_SIZE rows with `.range()`
+    so results larger than the API's max rows per response are complete.
+    `build_query()` returns the filtered, ordered select; it is called once per page.
+    """
+    rows, offset = [], 0
+    while True:
+        page = build_query().range(offset, offset + ENROLLMENT_PAGE_SIZE - 1).execute().data
+        rows += page
+        if len(page) < ENROLLMENT_PAGE_SIZE:
+            return rows
+        offset += ENROLLMENT_PAGE_SIZE
+
+async def load_course_seats(course_code: str):
+    """
+    Seat ledger loader: the course capacity (from the catalogue) and its enrolled students.
+    """
+    course = await catalog_cache.course(course_code)
+    capacity = course.get("capacity") if course else None
+
+    rows = await asyncio.to_thread(
+        select_all,
+        lambda: supabase.from_("Enrollments").select("reg_number").eq("course_code", course_code).order("id"),
+    )
+    return capacity, [row["reg_number"] for row in rows]
+
+seat_ledger = SeatLedger(load_course_seats, SEAT_LEDGER_TTL_SECONDS)
+
+def insert_enrollments(pairs: list[tuple[str, str]]) -> set[tuple[str, str]]:
+    """
+    Conditionally insert enrollments: rows that already exist are skipped by the
+    unique (reg_number, course_code) constraint. Returns the pairs actually inserted.
+    """
+    response = (
+        supabase
+        .from_("Enrollments")
+        .upsert(
+            [{"reg_number": reg_number, "course_code": course_code} for reg_number, course_code in pairs],
+            on_conflict="reg_number,course_code",
+            ignore_duplicates=True,
+        )
+        .execute()
+    )
+    return {(row["reg_number"], row["course_code"]) for row in response.data}
 
 async def enroll(data: dict):
     reg_number = data.get("reg_number")
     course_id = data.get("course_id")
 
     try:
-        # Check if the student is already enrolled in the course
-        existing_enrollment = (
-            supabase
-            .from_("Enrollments")
-            .select("*")
-            .eq("reg_number", reg_number)
-            .eq("course_code", course_id)
-            .execute()
-        )
-
-        if existing_enrollment.data:
+        # Admit or reject from the in-memory seat ledger (no check-then-insert round trip)
+        outcome = await seat_ledger.reserve(course_id, reg_number)
+        if outcome == ALREADY_ENROLLED:
             return {"message": "Already enrolled in this course."}
+        if outcome == COURSE_FULL:
+            return {"message": "Course is full."}
 
         print(f"Enrolling student {reg_number} in course {course_id}")
-        # Enroll the student in the course
-        response = (
-            supabase
-            .from_("Enrollments")
-            .insert({"reg_number": reg_number, "course_code": course_id})
-            .execute()
-        )
-
-        # if response.error:
-        #     raise Exception(f"Error enrolling in course: {response.status_code} - {response.error}")
+        # Hold the notification in the outbox first, then enroll the student in the course
+        held = None
+        try:
+            held = await hold_enrollment_notifications([(reg_number, course_id)])
+            inserted = await asyncio.to_thread(insert_enrollments, [(reg_number, course_id)])
+        except Exception:
+            seat_ledger.release(course_id, reg_number)
+            await settle_enrollment_notifications(held, [])
+            raise
 
-        # getting sender_id from faculty_member_profiles
+        # Release the notification if the row was inserted (the outbox relay publishes
+        # it in the background), or drop it
+        await settle_enrollment_notifications(held, list(inserted))
 
-        sender_id = (
-            supabase
-            .from_("Assigned")
-            .select("reg_number")
-            .eq("course_code", course_id)
-            .execute()
-        ).data[0]["reg_number"]
+        # The row exists whether it was inserted now or already there
+        seat_ledger.confirm(course_id, reg_number)
 
-        # getting course name from courses
-        course_name = (
-            supabase
-            .from_("Courses")
-            .select("course_name")
-            .eq("course_code", course_id)
-            .single()
-            .execute()
-        ).data["course_name"]
-
-        # Publish a message to the RabbitMQ queue for further processing
-        response_from_notifications = await publish_message_with_reply(
-            COURSES_NOTIFICATIONS_QUEUE,
-            {
-                "action": "addOneRecipientNotification",
-                "payload": {
-                    "course_id": course_id,
-                    "recipient_id": reg_number,
-                    "sender_id": sender_id,
-                    "title": "New Course Enrollment",
-                    "message": f"You have been successfully enrolled in the course {course_id} - {course_name}.",
-                }
-            }
-        )
+        if not inserted:
+            # Enrolled elsewhere (another instance or service) since the ledger loaded;
+            # the course is reloaded to catch other such writes
+            seat_ledger.invalidate(course_id)
+            return {"message": "Already enrolled in this course."}
 
-        print(f"Response from notifications service: {response_from_notifications}")
+        dashboard_cache.invalidate(reg_number)
 
         return {"message": "Successfully enrolled in the course."}
 
     except Exception as e:
         raise Exception(f"An error occurred while enrolling in the course: {str(e)}")
-    
+
+async def enroll_many(data: dict):
+    """
+    Enroll many (reg_number, course_code) pairs at once: one query to find existing
+    enrolments, one bulk insert and one queued notifications batch.
+    """
+    # Normalise and de-duplicate the requested pairs, keeping their order
+    pairs = list(dict.fromkeys(
+        (item.get("reg_number"), item.get("course_code") or item.get("course_id"))
+        for item in data.get("enrollments", [])
+    ))
+    pairs = [pair for pair in pairs if all(pair)]
+
+    if not pairs:
+        return {"message": "No enrollments to process.", "enrolled": [], "already_enrolled": [], "invalid": [], "full": []}
+
+    try:
+        reg_numbers = list({reg_number for reg_number, _ in pairs})
+        course_codes = list({course_code for _, course_code in pairs})
+
+        # Reject pairs for courses that are not in the catalogue
+        unknown_courses = {code for code in course_codes if await catalog_cache.course(code) is None}
+        invalid = [pair for pair in pairs if pair[1] in unknown_courses]
+
+        # Find every requested pair that is already enrolled, in pages: a cohort
+        # import's cross product easily exceeds the API's max rows per response
+        existing_rows = await asyncio.to_thread(
+            select_all,
+            lambda: (
+                supabase
+                .from_("Enrollments")
+                .select("reg_number, course_code")
+                .in_("reg_number", reg_numbers)
+                .in_("course_code", course_codes)
+                .order("id")
+            ),
+        )
+        existing = {(row["reg_number"], row["course_code"]) for row in existing_rows}
+
+        already_enrolled = [pair for pair in pairs if pair in existing]
+        candidates = [pair for pair in pairs if pair not in existing and pair[1] not in unknown_courses]
+
+        # Take a seat for each candidate; full courses reject the rest
+        reserved, full = [], []
+        for reg_number, course_code in candidates:
+            outcome = await seat_ledger.reserve(course_code, reg_number)
+            if outcome == RESERVED:
+                reserved.append((reg_number, course_code))
+            elif outcome == COURSE_FULL:
+                full.append((reg_number, course_code))
+            else:
+                already_enrolled.append((reg_number, course_code))
+
+        to_enroll = []
+        if reserved:
+            print(f"Enrolling {len(reserved)} student-course pairs")
+            held = None
+            try:
+                held = await hold_enrollment_notifications(reserved)
+                inserted = await asyncio.to_thread(insert_enrollments, reserved)
+            except Exception:
+                for reg_number, course_code in reserved:
+                    seat_ledger.release(course_code, reg_number)
+                await settle_enrollment_notifications(held, [])
+                raise
+
+            to_enroll = [pair for pair in reserved if pair in inserted]
+            await settle_enrollment_notifications(held, to_enroll)
+            conflicts = [pair for pair in reserved if pair not in inserted]
+            already_enrolled += conflicts
+            # Every reserved row now exists, conflicts having been enrolled elsewhere
+            for reg_number, course_code in reserved:
+                seat_ledger.confirm(course_code, reg_number)
+            for course_code in {course_code for _, course_code in conflicts}:
+                seat_ledger.invalidate(course_code)
+            for reg_number in {reg_number for reg_number, _ in to_enroll}:
+                dashboard_cache.invalidate(reg_number)
+
+        return {
+            "message": f"Enrolled {len(to_enroll)} of {len(pairs)} requested enrollments.",
+            "enrolled": [{"reg_number": r, "course_code": c} for r, c in to_enroll],
+            "already_enrolled": [{"reg_number": r, "course_code": c} for r, c in already_enrolled],
+            "invalid": [{"reg_number": r, "course_code": c} for r, c in invalid],
+            "full": [{"reg_number": r, "course_code": c} for r, c in full],
+        }
+
+    except Exception as e:
+        raise Exception(f"An error occurred while enrolling in courses: {str(e)}")
+
+async def build_enrollment_notifications(pairs: list[tuple[str, str]]) -> dict | None:
+    """
+    One batch of enrollment notifications for the given pairs, or None if there is
+    nothing to send. Course names and lecturers come from the catalogue cache, so no
+    extra database round trips are made.
+    """
+    notifications = []
+    for reg_number, course_code in pairs:
+        lecturers = await catalog_cache.lecturers_for_course(course_code)
+        if not lecturers:
+            # Notifications need a faculty sender; skip courses with no lecturer assigned
+            continue
+        course = await catalog_cache.course(course_code)
+        course_name = course["course_name"] if course else ""
+        notifications.append({
+            "course_code": course_code,
+            "recipient_id": reg_number,
+            "sender_id": lecturers[0],
+            "title": "New Course Enrollment",
+            "message": f"You have been successfully enrolled in the course {course_code} - {course_name}.",
+        })
+
+    if not notifications:
+        return None
+
+    return {
+        "action": "addRecipientNotifications",
+        "payload": {"notifications": notifications}
+    }
+
+async def hold_enrollment_notifications(pairs: list[tuple[str, str]]) -> int | None:
+    """
+    Store the notifications for pairs about to be inserted in the outbox, unpublished,
+    so they survive a crash between the insert and the publish. Returns the held id.
+    """
+    message = await build_enrollment_notifications(pairs)
+    if message is None:
+        return None
+    return await outbox.hold(COURSES_NOTIFICATIONS_QUEUE, message, kind=ENROLLMENT_NOTIFICATIONS)
+
+async def settle_enrollment_notifications(held: int | None, enrolled: list[tuple[str, str]]):
+    """
+    Once the insert has finished, release the held notifications with only the pairs
+    actually enrolled, or drop them if there are none.
+    """
+    if held is None:
+        return
+    message = await build_enrollment_notifications(enrolled)
+    if message is None:
+        await outbox.discard(held)
+    else:
+        await outbox.release(held, message)
+
+@outbox.recoverer(ENROLLMENT_NOTIFICATIONS)
+async def recover_enrollment_notifications(message: dict) -> dict | None:
+    """
+    Notifications held by a process that stopped mid-insert: keep those whose
+    enrolment row exists, so the insert is known to have happened.
+    """
+    notifications = message["payload"]["notifications"]
+    reg_numbers = list({n["recipient_id"] for n in notifications})
+    course_codes = list({n["course_code"] for n in notifications})
+    rows = await asyncio.to_thread(
+        select_all,
+        lambda: (
+            supabase
+            .from_("Enrollments")
+            .select("reg_number, course_code")
+            .in_("reg_number", reg_numbers)
+            .in_("course_code", course_codes)
+            .order("id")
+        ),
+    )
+    enrolled = {(row["reg_number"], row["course_code"]) for row in rows}
+
+    notifications = [n for n in notifications if (n["recipient_id"], n["course_code"]) in enrolled]
+    if not notifications:
+        return None
+    return {**message, "payload": {"notifications": notifications}}
+
 async def unenroll(data: dict):
     reg_number = data.get("reg_number")
     course_id = data.get("course_id")
@@ -105,6 +296,9 @@ async def unenroll(data: dict):
         # if response.error:
         #     raise Exception(f"Error unenrolling from course: {response.status_code} - {response.error}")
 
+        seat_ledger.release(course_id, reg_number)
+        dashboard_cache.invalidate(reg_number)
+
         return {"message": "Successfully unenrolled from the course."}
 
     except Exception as e:
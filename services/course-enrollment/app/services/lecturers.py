@@ -1,20 +1,13 @@
 from app.supabase.supabaseClient import supabase
+from app.services.catalog_cache import catalog_cache
 
 async def get_lecturers():
     try:
-        # Fetch all lecturers from the "Lecturers" table
-        response = (
-            supabase
-            .from_("faculty_member_profiles")
-            .select("*")
-            .execute()
-        )
-
-        # if response.error:
-        #     raise Exception(f"Error fetching lecturers: {response.status_code} - {response.error}")
+        # Lecturers from the "faculty_member_profiles" table, served from the catalogue cache
+        lecturers = await catalog_cache.lecturers()
 
-        print(f"✅ Lecturers: {response.data}")
-        return response.data
+        print(f"✅ Lecturers: {len(lecturers)}")
+        return lecturers
 
     except Exception as e:
         raise Exception(f"An error occurred while fetching lecturers: {str(e)}")
@@ -44,7 +37,9 @@ async def assign_course_to_lecturer(course_code: str, lecturer_reg_number: str):
         # if response.error:
         #     raise Exception(f"Error assigning course: {response.status_code} - {response.error}")
 
+        catalog_cache.invalidate()
+
         return {"message": "Course assigned successfully."}
 
     except Exception as e:
-        raise Exception(f"An error occurred while assigning the course: {str(e)}")
\ No newline at end of file
+        raise Exception(f"An error occurred while assigning the course: {str(e)}")
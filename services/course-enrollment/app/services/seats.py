@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+RESERVED = "reserved"
+ALREADY_ENROLLED = "already_enrolled"
+COURSE_FULL = "course_full"
+
+class CourseSeats:
+    __slots__ = ("capacity", "holders", "pending", "loaded_at")
+
+    def __init__(self, capacity: int | None, holders: set[str], loaded_at: float):
+        self.capacity = capacity
+        self.holders = holders          # enrolled
+        self.pending: set[str] = set()  # reserved, insert not finished yet; never in holders
+        self.loaded_at = loaded_at
+
+    def taken(self) -> int:
+        return len(self.holders) + len(self.pending)
+
+class SeatLedger:
+    """
+    In-memory seat counters per course.
+
+    Each course is loaded through `load_course(course_code) -> (capacity, reg_numbers)`;
+    after that `reserve()` admits or rejects a student in O(1) without touching the database.
+    A capacity of None means the course has no seat limit. The unique
+    (reg_number, course_code) constraint on Enrollments remains the source of truth,
+    so callers must `confirm()` a seat once its insert has finished with the row in
+    place (inserted, or already there), or `release()` it if the insert does not happen.
+
+    The ledger is per process, so a course is reloaded once it is older than `ttl`
+    seconds (picking up enrolments, unenrolments and capacity changes made elsewhere)
+    or after `invalidate(course_code)`. The reloaded holders are exactly the enrolled
+    rows; reservations whose insert is still in flight stay pending (and keep their
+    seat) until they are confirmed or released.
+    """
+
+    def __init__(self, load_course, ttl: float):
+        self._load_course = load_course
+        self.ttl = ttl
+        self._courses: dict[str, CourseSeats] = {}
+        self._loading: dict[str, asyncio.Future] = {}
+
+    async def _load(self, course_code: str) -> CourseSeats:
+        capacity, reg_numbers = await self._load_course(course_code)
+        seats = CourseSeats(capacity, set(reg_numbers), time.monotonic())
+        previous = self._courses.get(course_code)
+        if previous is not None:
+            seats.pending = previous.pending - seats.holders
+        self._courses[course_code] = seats
+        return seats
+
+    async def _get(self, course_code: str) -> CourseSeats:
+        seats = self._courses.get(course_code)
+        if seats is not None and time.monotonic() - seats.loaded_at <= self.ttl:
+            return seats
+
+        # Concurrent requests for a course share one load
+        future = self._loading.get(course_code)
+        if future is None:
+            future = asyncio.ensure_future(self._load(course_code))
+            self._loading[course_code] = future
+            future.add_done_callback(lambda _: self._loading.pop(course_code, None))
+        return await asyncio.shield(future)
+
+    async def reserve(self, course_code: str, reg_number: str) -> str:
+        seats = await self._get(course_code)
+        if reg_number in seats.holders or reg_number in seats.pending:
+            return ALREADY_ENROLLED
+        if seats.capacity is not None and seats.taken() >= seats.capacity:
+            return COURSE_FULL
+        seats.pending.add(reg_number)
+        return RESERVED
+
+    def confirm(self, course_code: str, reg_number: str):
+        seats = self._courses.get(course_code)
+        if seats is not None:
+            seats.pending.discard(reg_number)
+            seats.holders.add(reg_number)
+
+    def release(self, course_code: str, reg_number: str):
+        seats = self._courses.get(course_code)
+        if seats is not None:
+            seats.holders.discard(reg_number)
+            seats.pending.discard(reg_number)
+
+    def taken(self, course_code: str) -> int | None:
+        seats = self._courses.get(course_code)
+        return seats.taken() if seats is not None else None
+
+    def invalidate(self, course_code: str | None = None):
+        """Reload on next use; reservations still in flight stay pending."""
+        for seats in ([self._courses.get(course_code)] if course_code is not None else self._courses.values()):
+            if seats is not None:
+                seats.loaded_at = float("-inf")
@@ -0,0 +1,147 @@
+"""
+Load test for the seat reservation ledger.
+
+Simulates thousands of simultaneous enrolments (including duplicate requests) against
+SeatLedger with a fake Enrollments table that enforces the unique
+(reg_number, course_code) constraint, then checks that no course is over capacity
+and nobody is enrolled twice.
+
+With --through-enroll the requests go through `enrollments.enroll()` (seat ledger,
+insert, confirm/invalidate) instead of the ledger alone; only the Supabase insert,
+the course loader and the notification outbox are replaced by the fake table.
+
+Run from services/course-enrollment:
+    python -m benchmarks.seat_reservation_load_test --requests 5000 --courses 20 --capacity 150
+    python -m benchmarks.seat_reservation_load_test --through-enroll --ttl 0.05
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.services.seats import SeatLedger, RESERVED, ALREADY_ENROLLED, COURSE_FULL
+
+
+async def run(requests: int, courses: int, capacity: int, students: int, db_latency: float, spread: float,
+              ttl: float, through_enroll: bool):
+    course_codes = [f"CS{1000 + i}" for i in range(courses)]
+    enrollments: set[tuple[str, str]] = set()  # fake table with a unique constraint
+    loads = 0
+
+    async def load_course(course_code):
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(db_latency)
+        return capacity, [r for r, c in enrollments if c == course_code]
+
+    async def insert(reg_number, course_code):
+        await asyncio.sleep(random.uniform(0, db_latency))
+        if (reg_number, course_code) in enrollments:
+            return False
+        enrollments.add((reg_number, course_code))
+        return True
+
+    ledger = SeatLedger(load_course, ttl)
+
+    if through_enroll:
+        from app.services import enrollments as service
+
+        def insert_enrollments(pairs):
+            # Called in a worker thread by enroll(), like the real upsert
+            time.sleep(random.uniform(0, db_latency))
+            inserted = {pair for pair in pairs if pair not in enrollments}
+            enrollments.update(inserted)
+            return inserted
+
+        async def hold_enrollment_notifications(pairs):
+            return None
+
+        async def settle_enrollment_notifications(held, enrolled):
+            pass
+
+        service.seat_ledger = ledger
+        service.insert_enrollments = insert_enrollments
+        service.hold_enrollment_notifications = hold_enrollment_notifications
+        service.settle_enrollment_notifications = settle_enrollment_notifications
+        messages = {
+            "Successfully enrolled in the course.": RESERVED,
+            "Already enrolled in this course.": ALREADY_ENROLLED,
+            "Course is full.": COURSE_FULL,
+        }
+    outcomes = {RESERVED: 0, ALREADY_ENROLLED: 0, COURSE_FULL: 0}
+    admission_latencies = []
+
+    async def enroll(reg_number, course_code):
+        # Requests arrive at random points inside the burst window
+        await asyncio.sleep(random.uniform(0, spread))
+        warm = ledger.taken(course_code) is not None
+        started = time.perf_counter()
+        if through_enroll:
+            result = await service.enroll({"reg_number": reg_number, "course_id": course_code})
+            outcomes[messages[result["message"]]] += 1
+            if warm:
+                admission_latencies.append(time.perf_counter() - started)
+            return
+        outcome = await ledger.reserve(course_code, reg_number)
+        if warm:
+            # Admission once the course is loaded: no I/O, just the in-memory counters
+            admission_latencies.append(time.perf_counter() - started)
+        outcomes[outcome] += 1
+        if outcome == RESERVED:
+            if not await insert(reg_number, course_code):
+                raise AssertionError(f"duplicate insert for {reg_number} in {course_code}")
+            ledger.confirm(course_code, reg_number)
+
+    jobs = [
+        enroll(f"E/{random.randrange(students):05d}", random.choice(course_codes))
+        for _ in range(requests)
+    ]
+
+    started = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - started
+
+    per_course = {code: 0 for code in course_codes}
+    for _, course_code in enrollments:
+        per_course[course_code] += 1
+    assert max(per_course.values()) <= capacity, "course over capacity"
+    assert outcomes[RESERVED] == len(enrollments), "responses and table disagree"
+    for code in course_codes:
+        assert ledger.taken(code) in (None, per_course[code])
+
+    admission_latencies.sort()
+    print(f"requests:               {requests} over {courses} courses (capacity {capacity})"
+          f"{' through enroll()' if through_enroll else ''}")
+    print(f"reserved:               {outcomes[RESERVED]}")
+    print(f"already enrolled:       {outcomes[ALREADY_ENROLLED]}")
+    print(f"rejected (full):        {outcomes[COURSE_FULL]}")
+    print(f"course loads:           {loads}")
+    print(f"wall time:              {elapsed * 1000:.1f} ms ({requests / elapsed:.0f} req/s)")
+    if admission_latencies:
+        label = "warm enroll() p50/p99:" if through_enroll else "warm admission p50/p99:"
+        print(f"{label} {statistics.median(admission_latencies) * 1e6:.1f} / "
+              f"{admission_latencies[int(len(admission_latencies) * 0.99)] * 1e6:.1f} µs "
+              f"({len(admission_latencies)} samples)")
+    else:
+        print("warm admission p50/p99: n/a (every request arrived before its course was loaded)")
+    print("✅ no overbooking, no duplicate enrolments")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=150)
+    parser.add_argument("--students", type=int, default=4000)
+    parser.add_argument("--db-latency", type=float, default=0.005, help="simulated round trip in seconds")
+    parser.add_argument("--spread", type=float, default=0.1, help="burst window in seconds")
+    parser.add_argument("--ttl", type=float, default=30, help="seat ledger entry lifetime in seconds")
+    parser.add_argument("--through-enroll", action="store_true", help="drive enrollments.enroll() instead of the ledger")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.courses, args.capacity, args.students, args.db_latency, args.spread,
+                    args.ttl, args.through_enroll))
+
+
+if __name__ == "__main__":
+    main()
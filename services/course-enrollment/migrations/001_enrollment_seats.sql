@@ -0,0 +1,16 @@
+-- Seat reservation support for the course-enrollment service.
+
+-- Optional seat limit per course (NULL = unlimited)
+ALTER TABLE "Courses"
+    ADD COLUMN IF NOT EXISTS capacity integer CHECK (capacity IS NULL OR capacity > 0);
+
+-- Remove duplicate enrolments created by the old check-then-insert flow, keeping the oldest row
+DELETE FROM "Enrollments" e
+USING "Enrollments" d
+WHERE e.reg_number = d.reg_number
+  AND e.course_code = d.course_code
+  AND e.id > d.id;
+
+-- Enrolments are inserted with ON CONFLICT DO NOTHING against this constraint
+ALTER TABLE "Enrollments"
+    ADD CONSTRAINT enrollments_reg_number_course_code_key UNIQUE (reg_number, course_code);
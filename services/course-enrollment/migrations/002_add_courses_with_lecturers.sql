@@ -0,0 +1,22 @@
+-- Course creation for add_new_course / addCourses: the "Courses" rows and their
+-- "Assigned" lecturer rows are written by one function call, so they commit or
+-- fail together and a course is never left without its lecturers.
+--
+-- courses:     [{course_code, course_name, course_description, year, semester,
+--                credits, day_of_week, start_time, capacity}, ...]
+-- assignments: [{course_code, lecturer_reg_number}, ...]
+
+CREATE OR REPLACE FUNCTION add_courses_with_lecturers(courses jsonb, assignments jsonb)
+RETURNS void
+LANGUAGE sql
+AS $$
+    INSERT INTO "Courses" (course_code, course_name, course_description, year, semester,
+                           credits, day_of_week, start_time, capacity)
+    SELECT c.course_code, c.course_name, c.course_description, c.year, c.semester,
+           c.credits, c.day_of_week, c.start_time, c.capacity
+    FROM jsonb_populate_recordset(NULL::"Courses", courses) AS c;
+
+    INSERT INTO "Assigned" (course_code, lecturer_reg_number)
+    SELECT a.course_code, a.lecturer_reg_number
+    FROM jsonb_populate_recordset(NULL::"Assigned", assignments) AS a;
+$$;
@@ -1,5 +1,5 @@
-from app.services.add_notification_service import add_course_notification, add_one_recipient_notification
-from app.services.get_notifications_service import get_notifications
+from app.services.add_notification_service import add_course_notification, add_one_recipient_notification, add_recipient_notifications, add_course_notifications_batch
+from app.services.get_notifications_service import get_notifications, get_unread_count, mark_notifications_read
 from app.services.get_notification_details_service import get_notification_details
 from app.services.get_admin_notifications_service import get_admin_notifications
 from app.services.get_admin_notification_details_service import get_admin_notification_details
@@ -12,8 +12,16 @@ async def handle_message(payload: dict):
         return await add_course_notification(data)
     elif action == "addOneRecipientNotification":
         return await add_one_recipient_notification(data)
+    elif action == "addRecipientNotifications":
+        return await add_recipient_notifications(data)
+    elif action == "addCourseNotificationsBatch":
+        return await add_course_notifications_batch(data)
     elif action == "getNotifications":
         return await get_notifications(data)
+    elif action == "getUnreadCount":
+        return await get_unread_count(data)
+    elif action == "markNotificationsRead":
+        return await mark_notifications_read(data)
     elif action == "getNotificationDetails":
         return await get_notification_details(data)
     elif action == "getAdminNotifications":
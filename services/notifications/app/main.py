@@ -3,8 +3,10 @@ import asyncio
 from app.rabbitMQ.apiGatewayConsumer import consume_gateway_messages
 from app.rabbitMQ.coursesConsumer import consume_courses_messages
 from app.rabbitMQ.schedulingConsumer import consume_scheduling_messages
+from app.realtime.routes import router as realtime_router
 
 app = FastAPI()
+app.include_router(realtime_router)
 
 @app.on_event("startup")
 async def startup_event():
@@ -1,7 +1,7 @@
 # notifications/app/rabbitmq/consumer.py
 import aio_pika
-import json
 from app.config import RABBITMQ_URL, NOTIFICATION_QUEUE
+from app.rabbitmq.codec import decode, encode
 from app.controllers.notification_controller import handle_message
 
 async def consume_gateway_messages():
@@ -13,7 +13,7 @@ async def consume_gateway_messages():
     async with queue.iterator() as queue_iter:
         async for message in queue_iter:
             async with message.process():
-                payload = json.loads(message.body.decode())
+                payload = decode(message.body, message.content_type)
 
                 response = await handle_message(payload)
 
@@ -21,12 +21,14 @@ async def consume_gateway_messages():
                 correlation_id = message.correlation_id
 
                 if reply_to and correlation_id:
+                    body, content_type = encode({
+                        "status": "success",
+                        "result": response
+                    }, message.content_type)
                     await channel.default_exchange.publish(
                         aio_pika.Message(
-                            body=json.dumps({
-                                "status": "success",
-                                "result": response
-                            }).encode(),
+                            body=body,
+                            content_type=content_type,
                             correlation_id=correlation_id
                         ),
                         routing_key=reply_to
@@ -0,0 +1,22 @@
+import jwt
+from fastapi import WebSocket
+from app.config import JWT_SECRET
+
+
+def authenticated_user(websocket: WebSocket) -> str | None:
+    """
+    The user id in the caller's session token, or None if there is no valid token.
+
+    The token is the one the API gateway's auth middleware checks: the `token`
+    cookie (sent with the websocket handshake), or a `token` query parameter for
+    clients that cannot set cookies.
+    """
+    token = websocket.cookies.get("token") or websocket.query_params.get("token")
+    if not token or not JWT_SECRET:
+        return None
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+    except jwt.PyJWTError:
+        return None
+    user_id = claims.get("id")
+    return str(user_id) if user_id is not None else None
@@ -0,0 +1,49 @@
+import asyncio
+from app.config import REALTIME_QUEUE_SIZE
+
+# Put on a subscriber's queue when it fell too far behind; the stream tells the
+# client to reconnect with its last cursor and catch up from the database
+RESYNC = None
+
+class NotificationHub:
+    """
+    In-memory per-user fan-out of newly stored notifications.
+
+    Each open stream subscribes a bounded queue for its user; `publish()` puts the
+    notification on every queue of that user without waiting. The hub only knows
+    about streams connected to this process.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: str, notification: dict):
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(notification)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and ask it to resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.unsubscribe(user_id, queue)
+
+    def connected(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+
+hub = NotificationHub(REALTIME_QUEUE_SIZE)
@@ -0,0 +1,85 @@
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.supabase.supabaseConfig import supabase
+from app.config import NOTIFICATION_MAX_PAGE_SIZE
+from app.realtime.auth import authenticated_user
+from app.realtime.hub import hub, RESYNC
+from app.services.get_notifications_service import INBOX_COLUMNS
+from app.services.pagination import newer_than, cursor_of
+
+router = APIRouter()
+
+
+async def missed_notifications(user_id: str, cursor: str):
+    """Notifications stored after `cursor`, oldest first, one page at a time."""
+    while True:
+        query = supabase.table("notification_inbox").select(INBOX_COLUMNS).eq("recipient_id", user_id)
+        response = await asyncio.to_thread(
+            newer_than(query, cursor, "notification_id")
+            .order("created_at")
+            .order("notification_id")
+            .limit(NOTIFICATION_MAX_PAGE_SIZE)
+            .execute
+        )
+        for notification in response.data:
+            yield notification
+        if len(response.data) < NOTIFICATION_MAX_PAGE_SIZE:
+            return
+        cursor = cursor_of(response.data[-1], "notification_id")
+
+
+def event(notification: dict) -> dict:
+    return {"type": "notification", "notification": notification, "cursor": cursor_of(notification, "notification_id")}
+
+
+@router.websocket("/notifications/stream/{user_id}")
+async def notification_stream(websocket: WebSocket, user_id: str, cursor: str | None = None):
+    """
+    Push a user's new notifications as they are stored.
+
+    A client reconnecting with the `cursor` of the last event it received first gets
+    everything it missed from the inbox, then live events. The caller must hold a
+    session token for `user_id`; anyone else is refused before the handshake completes.
+    """
+    if authenticated_user(websocket) != user_id:
+        print(f"⛔ Refused notification stream for user {user_id}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    # Subscribe before catching up so nothing stored meanwhile is lost
+    queue = hub.subscribe(user_id)
+    print(f"🔌 Notification stream opened for user {user_id} (cursor: {cursor})")
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        sent = set()
+        if cursor:
+            async for notification in missed_notifications(user_id, cursor):
+                await websocket.send_json(event(notification))
+                sent.add(notification["notification_id"])
+
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                # Clients have nothing to say on this stream; ignore and keep listening
+                receiver = asyncio.ensure_future(websocket.receive())
+                continue
+
+            notification = getter.result()
+            if notification is RESYNC:
+                await websocket.send_json({"type": "resync"})
+                await websocket.close()
+                break
+            if notification["notification_id"] in sent:
+                continue
+            await websocket.send_json(event(notification))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(user_id, queue)
+        print(f"🔌 Notification stream closed for user {user_id}")
@@ -1,8 +1,10 @@
+import asyncio
 #from app.db import supabase
 from app.supabase.supabaseConfig import supabase
+from app.services.fanout_service import deliver, fan_out
+from app.services.reference_cache import reference_cache
+from app.config import ENROLLMENT_PAGE_SIZE
 from app.models.notification_model import courseNotificationAddRequest, oneRecipientNotificationAddRequest
-import uuid
-from datetime import datetime
 from pydantic import ValidationError
 
 async def add_course_notification(data: dict):
@@ -26,13 +28,11 @@ async def add_course_notification(data: dict):
     try:
 
         # validate course_code
-        course_response = supabase.table("Courses").select("course_code").eq("course_code", course_code).execute()
-        if not course_response.data:
+        if not await reference_cache.exists("Courses", "course_code", course_code):
             return {"status": "error", "message": f"Course {course_code} does not exist"}
         
         # validate sender_id
-        faculty_response = supabase.table("faculty_member_profiles").select("reg_number").eq("reg_number", sender_id).execute()
-        if not faculty_response.data:
+        if not await reference_cache.exists("faculty_member_profiles", "reg_number", sender_id):
             return {"status": "error", "message": f"Faculty member {sender_id} does not exist"}
 
 
@@ -58,29 +58,11 @@ async def add_course_notification(data: dict):
 
         # students = student_response.data
 
-        # Step 3: Create notifications for each student
-        notifications = []
-        for reg_number in reg_numbers:
-            notif = {
-                "notification_id": str(uuid.uuid4()),
-                "recipient_id": reg_number,
-                "sender_id": sender_id,
-                "course_code": course_code,
-                "title": title,
-                "message": message,
-                "created_at": datetime.now().isoformat()
-            }
-            notifications.append(notif)
-
-        # Step 4: Batch insert notifications
-        response = supabase.table("Notifications").insert(notifications).execute()
-        # if response.error:
-        #     print(f"❌ Error inserting notifications: {response.error}")
-        #     return {"status": "error", "message": "Failed to send notifications"}
-        print(f"Response: {response}")
-
-        print(f"✅ Sent notifications to {len(notifications)} students in course {course_code}")
-        return {"status": "success", "count": len(notifications)}
+        # Step 3: Fan the notification out to every student in chunks
+        result = await fan_out(reg_numbers, sender_id, course_code, title, message)
+
+        print(f"✅ Sent notifications to {result['count']} of {len(reg_numbers)} students in course {course_code}")
+        return result
 
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
@@ -104,40 +86,152 @@ async def add_one_recipient_notification(data: dict):
 
     try:
         # validate course_code
-        course_response = supabase.table("Courses").select("course_code").eq("course_code", course_code).execute()
-        if not course_response.data:
+        if not await reference_cache.exists("Courses", "course_code", course_code):
             return {"status": "error", "message": f"Course {course_code} does not exist"}
         
         # validate sender_id
-        faculty_response = supabase.table("faculty_member_profiles").select("reg_number").eq("reg_number", sender_id).execute()
-        if not faculty_response.data:
+        if not await reference_cache.exists("faculty_member_profiles", "reg_number", sender_id):
             return {"status": "error", "message": f"Faculty member {sender_id} does not exist"}
 
         # validate recipient_id
-        student_response = supabase.table("Student profiles").select("reg_number").eq("reg_number", recipient_id).execute()
-        if not student_response.data:
+        if not await reference_cache.exists("Student profiles", "reg_number", recipient_id):
             return {"status": "error", "message": f"Student with registration number {recipient_id} does not exist"}
 
         # Step 1: Create the notification
         notification = {
-            "notification_id": str(uuid.uuid4()),
             "recipient_id": recipient_id,
             "sender_id": sender_id,
             "course_code": course_code,
             "title": title,
             "message": message,
-            "created_at": datetime.now().isoformat()
         }
 
-        # Step 2: Insert the notification into the database
-        response = supabase.table("Notifications").insert(notification).execute()
-        # if response.error:
-        #     print(f"❌ Error inserting notification: {response.error}")
-        #     return {"status": "error", "message": "Failed to send notification"}
-        print(f"Response: {response}")
+        # Step 2: Store the notification (message + delivery row in shared mode)
+        result = await deliver([notification])
+        if result["status"] != "success":
+            return {"status": "error", "message": "Failed to send notification"}
 
         print(f"✅ Sent notification to student {recipient_id} in course {course_code}")
         return {"status": "success", "notification_id": notification["notification_id"]}
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
         return {"status": "error", "message": str(e)}
+
+
+async def add_recipient_notifications(data: dict):
+    try:
+        notification_add_requests = [oneRecipientNotificationAddRequest(**n) for n in data.get("notifications", [])]
+    except ValidationError as ve:
+        print(ve.json())
+        return {"status": "error", "message": "Invalid input", "details": ve.errors()}
+
+    if not notification_add_requests:
+        return {"status": "success", "count": 0, "rejected": []}
+
+    course_codes = list({n.course_code for n in notification_add_requests})
+    sender_ids = list({n.sender_id for n in notification_add_requests})
+    recipient_ids = list({n.recipient_id for n in notification_add_requests})
+
+    try:
+        # Validate all courses, senders and recipients; only uncached values hit the database
+        known_courses = await reference_cache.existing("Courses", "course_code", course_codes)
+        known_senders = await reference_cache.existing("faculty_member_profiles", "reg_number", sender_ids)
+        known_recipients = await reference_cache.existing("Student profiles", "reg_number", recipient_ids)
+
+        notifications = []
+        rejected = []
+        for n in notification_add_requests:
+            if n.course_code not in known_courses:
+                rejected.append({"recipient_id": n.recipient_id, "message": f"Course {n.course_code} does not exist"})
+            elif n.sender_id not in known_senders:
+                rejected.append({"recipient_id": n.recipient_id, "message": f"Faculty member {n.sender_id} does not exist"})
+            elif n.recipient_id not in known_recipients:
+                rejected.append({"recipient_id": n.recipient_id, "message": f"Student with registration number {n.recipient_id} does not exist"})
+            else:
+                notifications.append({
+                    "recipient_id": n.recipient_id,
+                    "sender_id": n.sender_id,
+                    "course_code": n.course_code,
+                    "title": n.title,
+                    "message": n.message,
+                })
+
+        # Batch insert the accepted notifications in chunks; identical messages are stored once
+        result = {**await deliver(notifications), "rejected": rejected}
+
+        print(f"✅ Sent {result['count']} notifications, rejected {len(rejected)}")
+        return result
+    except Exception as e:
+        print(f"❌ Exception occurred: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+def enrolled_students(course_codes: list[str]) -> dict[str, list[str]]:
+    """
+    reg_numbers enrolled in each course, read in pages of ENROLLMENT_PAGE_SIZE rows so
+    a batch spanning more enrolments than the API's max rows per response is complete.
+    """
+    students, offset = {}, 0
+    while True:
+        rows = (
+            supabase.table("Enrollments")
+            .select("course_code, reg_number")
+            .in_("course_code", course_codes)
+            .order("id")
+            .range(offset, offset + ENROLLMENT_PAGE_SIZE - 1)
+            .execute()
+        ).data
+        for e in rows:
+            students.setdefault(e["course_code"], []).append(e["reg_number"])
+        if len(rows) < ENROLLMENT_PAGE_SIZE:
+            return students
+        offset += ENROLLMENT_PAGE_SIZE
+
+async def add_course_notifications_batch(data: dict):
+    try:
+        notification_add_requests = [courseNotificationAddRequest(**n) for n in data.get("notifications", [])]
+    except ValidationError as ve:
+        print(ve.json())
+        return {"status": "error", "message": "Invalid input", "details": ve.errors()}
+
+    if not notification_add_requests:
+        return {"status": "success", "count": 0, "rejected": []}
+
+    course_codes = list({n.course_code for n in notification_add_requests})
+    sender_ids = list({n.sender_id for n in notification_add_requests})
+
+    try:
+        known_courses = await reference_cache.existing("Courses", "course_code", course_codes)
+        known_senders = await reference_cache.existing("faculty_member_profiles", "reg_number", sender_ids)
+
+        # One enrolment query for every known course in the batch
+        students = {}
+        if known_courses:
+            students = await asyncio.to_thread(enrolled_students, list(known_courses))
+
+        notifications = []
+        rejected = []
+        for n in notification_add_requests:
+            if n.course_code not in known_courses:
+                rejected.append({"course_code": n.course_code, "message": f"Course {n.course_code} does not exist"})
+            elif n.sender_id not in known_senders:
+                rejected.append({"course_code": n.course_code, "message": f"Faculty member {n.sender_id} does not exist"})
+            elif not students.get(n.course_code):
+                rejected.append({"course_code": n.course_code, "message": f"No students enrolled in course {n.course_code}"})
+            else:
+                notifications.extend({
+                    "recipient_id": reg_number,
+                    "sender_id": n.sender_id,
+                    "course_code": n.course_code,
+                    "title": n.title,
+                    "message": n.message,
+                } for reg_number in students[n.course_code])
+
+        # Every course's notification is stored once and delivered to its students
+        result = {**await deliver(notifications), "rejected": rejected}
+
+        print(f"✅ Sent {result['count']} notifications for {len(notification_add_requests) - len(rejected)} courses, rejected {len(rejected)}")
+        return result
+    except Exception as e:
+        print(f"❌ Exception occurred: {e}")
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from app.supabase.supabaseConfig import supabase
+from app.config import NOTIFICATION_CHUNK_SIZE, NOTIFICATION_MAX_PARALLEL_INSERTS, NOTIFICATION_FANOUT_MODE
+from app.realtime.hub import hub
+
+# Fan-out storage modes
+COPY_MODE = "copy"      # one full Notifications row per recipient
+SHARED_MODE = "shared"  # one NotificationMessages row per distinct message + one NotificationRecipients row per recipient
+
+
+def chunked(rows: list, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def insert_chunked(table: str, rows: list[dict]) -> list[dict]:
+    """
+    Insert rows in chunks of NOTIFICATION_CHUNK_SIZE, running at most
+    NOTIFICATION_MAX_PARALLEL_INSERTS inserts at once.
+    Returns one report entry per chunk with its size, latency and outcome.
+    """
+    semaphore = asyncio.Semaphore(NOTIFICATION_MAX_PARALLEL_INSERTS)
+
+    async def insert_chunk(index: int, chunk: list[dict]) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(supabase.table(table).insert(chunk, returning="minimal").execute)
+                status, error = "success", None
+            except Exception as e:
+                status, error = "error", str(e)
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        report = {"chunk": index, "rows": len(chunk), "latency_ms": latency_ms, "status": status}
+        if error:
+            report["message"] = error
+        print(f"{'✅' if status == 'success' else '❌'} {table} chunk {index}: {len(chunk)} rows in {latency_ms} ms")
+        return report
+
+    return await asyncio.gather(*(
+        insert_chunk(index, chunk) for index, chunk in enumerate(chunked(rows, NOTIFICATION_CHUNK_SIZE))
+    ))
+
+
+def publish_stored(notifications: list[dict], chunks: list[dict]):
+    """Push the notifications whose insert chunk succeeded to connected streams."""
+    for c in chunks:
+        if c["status"] != "success":
+            continue
+        start = c["chunk"] * NOTIFICATION_CHUNK_SIZE
+        for n in notifications[start:start + c["rows"]]:
+            if hub.connected(n["recipient_id"]):
+                hub.publish(n["recipient_id"], {
+                    "notification_id": n["notification_id"],
+                    "message_id": n.get("message_id"),
+                    "sender_id": n["sender_id"],
+                    "course_code": n["course_code"],
+                    "title": n["title"],
+                    "created_at": n["created_at"],
+                    "read_at": None,
+                })
+
+
+def summarize(chunks: list[dict], **extra) -> dict:
+    inserted = sum(c["rows"] for c in chunks if c["status"] == "success")
+    failed = sum(c["rows"] for c in chunks if c["status"] != "success")
+    return {
+        "status": "success" if not failed else "error",
+        "count": inserted,
+        "failed": failed,
+        "chunks": chunks,
+        **extra,
+    }
+
+
+async def deliver(notifications: list[dict], mode: str = NOTIFICATION_FANOUT_MODE) -> dict:
+    """
+    Store notifications given as dicts with recipient_id, sender_id, course_code,
+    title and message (plus optional notification_id / created_at).
+
+    In COPY_MODE every notification is a full Notifications row. In SHARED_MODE
+    notifications with the same sender, course, title and message share one
+    NotificationMessages row and each recipient only gets a NotificationRecipients row.
+    notification_id and created_at are filled in on the given dicts, and stored
+    notifications are pushed to the recipients' open streams.
+    """
+    created_at = datetime.now().isoformat()
+    for n in notifications:
+        n.setdefault("notification_id", str(uuid.uuid4()))
+        n.setdefault("created_at", created_at)
+
+    if mode != SHARED_MODE:
+        chunks = await insert_chunked("Notifications", notifications)
+        publish_stored(notifications, chunks)
+        return summarize(chunks)
+
+    messages = {}
+    recipients = []
+    for n in notifications:
+        key = (n["sender_id"], n["course_code"], n["title"], n["message"])
+        stored = messages.get(key)
+        if stored is None:
+            stored = messages[key] = {
+                "message_id": str(uuid.uuid4()),
+                "sender_id": n["sender_id"],
+                "course_code": n["course_code"],
+                "title": n["title"],
+                "message": n["message"],
+                "created_at": n["created_at"],
+            }
+        n["message_id"] = stored["message_id"]
+        recipients.append({
+            "notification_id": n["notification_id"],
+            "message_id": stored["message_id"],
+            "recipient_id": n["recipient_id"],
+            "created_at": n["created_at"],
+        })
+
+    message_chunks = await insert_chunked("NotificationMessages", list(messages.values()))
+    if any(c["status"] != "success" for c in message_chunks):
+        # Recipient rows would reference missing messages, so none are inserted
+        return {"status": "error", "count": 0, "failed": len(recipients), "chunks": message_chunks, "message_ids": []}
+    chunks = await insert_chunked("NotificationRecipients", recipients)
+    publish_stored(notifications, chunks)
+    return summarize(chunks, message_ids=[m["message_id"] for m in messages.values()])
+
+
+async def fan_out(recipient_ids: list[str], sender_id: str, course_code: str, title: str, message: str,
+                  mode: str = NOTIFICATION_FANOUT_MODE) -> dict:
+    """Deliver one notification to many recipients."""
+    return await deliver([
+        {
+            "recipient_id": recipient_id,
+            "sender_id": sender_id,
+            "course_code": course_code,
+            "title": title,
+            "message": message,
+        }
+        for recipient_id in recipient_ids
+    ], mode)
@@ -9,8 +9,15 @@ async def get_admin_notification_details(data: dict):
         return {"status": "error", "message": "Notification ID is required"}
 
     try:
-        # Query the database for the specific notification
-        response = supabase.table("Notifications").select("*").eq("notification_id", notification_id).execute()
+        # Admin listings are per message, so the id is normally a message_id;
+        # fall back to a single delivery for links to one recipient's notification
+        response = supabase.table("notification_message_stats").select("*").eq("message_id", notification_id).execute()
+        if response.data:
+            notification = response.data[0]
+            print(f"✅ Admin notification details retrieved: {notification['message_id']}")
+            return {"status": "success", "notification": notification}
+
+        response = supabase.table("notification_inbox").select("*").eq("notification_id", notification_id).execute()
 
         # if response.error:
         #     print(f"❌ Error fetching admin notification details: {response.error}")
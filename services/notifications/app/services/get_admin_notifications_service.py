@@ -1,28 +1,35 @@
 #from app.db import supabase
 from app.supabase.supabaseConfig import supabase
+from app.services.pagination import page_size, after_cursor, newest_first, page
+
+# Columns shown in the sent-items list; counts are aggregated per message by the view
+SENT_COLUMNS = "message_id, course_code, title, created_at, recipient_count, read_count"
 
 async def get_admin_notifications(data: dict):
     faculty_member_id = data.get("facultyId")
-    print(f"📥 Retrieving notifications sent by faculty: {faculty_member_id}")
+    cursor = data.get("cursor")
+    limit = page_size(data)
+    print(f"📥 Retrieving notifications sent by faculty: {faculty_member_id} (cursor: {cursor}, limit: {limit})")
 
     if not faculty_member_id:
         return {"status": "error", "message": "Faculty ID is required"}
 
     try:
-        # Query the database for notifications sent by the admin
-        response = supabase.table("Notifications").select("*").eq("sender_id", faculty_member_id).execute()
+        # One page of messages sent by the admin, newest first, one entry per broadcast
+        query = supabase.table("notification_message_stats").select(SENT_COLUMNS).eq("sender_id", faculty_member_id)
+        response = newest_first(after_cursor(query, cursor, "message_id"), "message_id", limit).execute()
 
         # if response.get('error'):
         #     print(f"❌ Error fetching admin notifications: {response.error}")
         #     return {"status": "error", "message": "Failed to fetch admin notifications"}
 
-        if not response.data:
+        if not response.data and not cursor:
             return {"status": "error", "message": "No notifications found for this faculty member"}
 
-        notifications = response.data
-        print(f"✅ Admin notifications retrieved: {notifications}")
+        notifications, next_cursor = page(response.data, limit, "message_id")
+        print(f"✅ Admin notifications retrieved: {len(notifications)} messages")
 
-        return {"status": "success", "notifications": notifications}
+        return {"status": "success", "notifications": notifications, "next_cursor": next_cursor}
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
@@ -10,7 +10,7 @@ async def get_notification_details(data: dict):
 
     try:
         # Query the database for the specific notification
-        response = supabase.table("Notifications").select("*").eq("notification_id", notification_id).execute()
+        response = supabase.table("notification_inbox").select("*").eq("notification_id", notification_id).execute()
         print(f"Response: {response}")
         # if response.error:
         #     print(f"❌ Error fetching notification details: {response.error}")
@@ -1,29 +1,82 @@
 #from app.db import supabase
 from app.supabase.supabaseConfig import supabase
+from datetime import datetime
+from app.services.pagination import page_size, after_cursor, newest_first, page
+
+# Columns shown in the inbox list; the full message is fetched with getNotificationDetails
+INBOX_COLUMNS = "notification_id, message_id, sender_id, course_code, title, created_at, read_at"
 
 async def get_notifications(data: dict):
     user_id = data.get("userId")
-    print(f"📥 Retrieving notifications for user: {user_id}")
+    cursor = data.get("cursor")
+    limit = page_size(data)
+    print(f"📥 Retrieving notifications for user: {user_id} (cursor: {cursor}, limit: {limit})")
 
     if not user_id:
         return {"status": "error", "message": "User ID is required"}
 
     try:
-        # Fetch notifications for the user
-        response = supabase.table("Notifications").select("*").eq("recipient_id", user_id).execute()
-
-        print(f"Response: {response}")
+        # Fetch one page of the user's notifications, newest first
+        query = supabase.table("notification_inbox").select(INBOX_COLUMNS).eq("recipient_id", user_id)
+        response = newest_first(after_cursor(query, cursor, "notification_id"), "notification_id", limit).execute()
 
         # if response.error:
         #     print(f"❌ Error fetching notifications: {response.error}")
         #     return {"status": "error", "message": "Failed to fetch notifications"}
-        if not response.data:
+        if not response.data and not cursor:
             return {"status": "error", "message": "No notifications found for this user"}
 
-        notifications = response.data
-        print(f"✅ Notifications retrieved: {notifications}")
+        notifications, next_cursor = page(response.data, limit, "notification_id")
+        print(f"✅ Notifications retrieved: {len(notifications)}")
+
+        return {"status": "success", "notifications": notifications, "next_cursor": next_cursor}
+    except Exception as e:
+        print(f"❌ Exception occurred: {e}")
+        return {"status": "error", "message": "An error occurred while fetching notifications"}
+
+
+async def get_unread_count(data: dict):
+    user_id = data.get("userId")
+
+    if not user_id:
+        return {"status": "error", "message": "User ID is required"}
+
+    try:
+        # Count only; no rows are returned
+        response = (
+            supabase.table("NotificationRecipients")
+            .select("notification_id", count="exact", head=True)
+            .eq("recipient_id", user_id)
+            .is_("read_at", "null")
+            .execute()
+        )
+        return {"status": "success", "unread": response.count or 0}
+    except Exception as e:
+        print(f"❌ Exception occurred: {e}")
+        return {"status": "error", "message": "An error occurred while counting unread notifications"}
+
+
+async def mark_notifications_read(data: dict):
+    user_id = data.get("userId")
+    notification_ids = data.get("notificationIds")
+
+    if not user_id:
+        return {"status": "error", "message": "User ID is required"}
+
+    try:
+        # Mark the given notifications, or all of the user's unread ones when none are given
+        query = (
+            supabase.table("NotificationRecipients")
+            .update({"read_at": datetime.now().isoformat()}, count="exact", returning="minimal")
+            .eq("recipient_id", user_id)
+            .is_("read_at", "null")
+        )
+        if notification_ids:
+            query = query.in_("notification_id", notification_ids)
+        response = query.execute()
 
-        return {"status": "success", "notifications": notifications}
+        print(f"✅ Marked {response.count or 0} notifications as read for user {user_id}")
+        return {"status": "success", "count": response.count or 0}
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
-        return {"status": "error", "message": "An error occurred while fetching notifications"}
\ No newline at end of file
+        return {"status": "error", "message": "An error occurred while marking notifications as read"}
@@ -0,0 +1,52 @@
+from app.config import NOTIFICATION_PAGE_SIZE, NOTIFICATION_MAX_PAGE_SIZE
+
+CURSOR_SEPARATOR = "|"
+
+
+def page_size(data: dict) -> int:
+    try:
+        limit = int(data.get("limit") or NOTIFICATION_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = NOTIFICATION_PAGE_SIZE
+    return max(1, min(limit, NOTIFICATION_MAX_PAGE_SIZE))
+
+
+def after_cursor(query, cursor: str | None, id_column: str):
+    """
+    Restrict a query ordered by (created_at DESC, id_column DESC) to the rows after `cursor`,
+    a value previously returned as `next_cursor`.
+    """
+    if not cursor:
+        return query
+    created_at, _, row_id = cursor.partition(CURSOR_SEPARATOR)
+    return query.or_(
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",{id_column}.lt."{row_id}")'
+    )
+
+
+def newer_than(query, cursor: str | None, id_column: str):
+    """Restrict a query to the rows newer than `cursor` (used to resume a live stream)."""
+    if not cursor:
+        return query
+    created_at, _, row_id = cursor.partition(CURSOR_SEPARATOR)
+    return query.or_(
+        f'created_at.gt."{created_at}",'
+        f'and(created_at.eq."{created_at}",{id_column}.gt."{row_id}")'
+    )
+
+
+def cursor_of(row: dict, id_column: str) -> str:
+    return f"{row['created_at']}{CURSOR_SEPARATOR}{row[id_column]}"
+
+
+def newest_first(query, id_column: str, limit: int):
+    # One extra row tells us whether there is another page
+    return query.order("created_at", desc=True).order(id_column, desc=True).limit(limit + 1)
+
+
+def page(rows: list[dict], limit: int, id_column: str) -> tuple[list[dict], str | None]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, cursor_of(rows[-1], id_column)
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from collections import OrderedDict
+from app.supabase.supabaseConfig import supabase
+from app.config import REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS, REFERENCE_CACHE_MAX_ENTRIES
+
+class ExistenceCache:
+    """
+    Remembers whether reference rows (courses, faculty members, students) exist.
+
+    `existing(table, column, values)` answers from memory where it can and looks up
+    only the unknown or expired values with one `in` query. Values that were found
+    are remembered for `ttl` seconds, values that were not found for `negative_ttl`
+    seconds, so a newly created row is picked up quickly.
+
+    At most `max_entries` values are kept: expired entries are dropped when they are
+    looked up, and the least recently used ones are evicted once the cache is full.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], tuple[bool, float]] = OrderedDict()
+
+    async def existing(self, table: str, column: str, values) -> set:
+        now = time.monotonic()
+        found, missing = set(), []
+        for value in set(values):
+            key = (table, column, value)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                missing.append(value)
+                continue
+            self._entries.move_to_end(key)
+            if entry[0]:
+                found.add(value)
+
+        if missing:
+            response = await asyncio.to_thread(
+                supabase.table(table).select(column).in_(column, missing).execute
+            )
+            loaded = {row[column] for row in response.data}
+            now = time.monotonic()
+            for value in missing:
+                exists = value in loaded
+                key = (table, column, value)
+                self._entries[key] = (exists, now + (self.ttl if exists else self.negative_ttl))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            found |= loaded
+
+        return found
+
+    async def exists(self, table: str, column: str, value) -> bool:
+        return value in await self.existing(table, column, [value])
+
+    def invalidate(self, table: str | None = None):
+        if table is None:
+            self._entries.clear()
+        else:
+            self._entries = OrderedDict((key, entry) for key, entry in self._entries.items() if key[0] != table)
+
+
+reference_cache = ExistenceCache(REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS, REFERENCE_CACHE_MAX_ENTRIES)
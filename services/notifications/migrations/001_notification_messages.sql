@@ -0,0 +1,21 @@
+-- Shared-message storage for broadcast notifications (NOTIFICATION_FANOUT_MODE = "shared").
+-- The title and message of a broadcast are stored once; each recipient gets a small row.
+
+CREATE TABLE IF NOT EXISTS "NotificationMessages" (
+    message_id uuid PRIMARY KEY,
+    sender_id text NOT NULL REFERENCES faculty_member_profiles (reg_number),
+    course_code text REFERENCES "Courses" (course_code),
+    title text NOT NULL,
+    message text NOT NULL,
+    created_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS "NotificationRecipients" (
+    notification_id uuid PRIMARY KEY,
+    message_id uuid NOT NULL REFERENCES "NotificationMessages" (message_id) ON DELETE CASCADE,
+    recipient_id text NOT NULL,
+    created_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS notification_recipients_message_id_idx
+    ON "NotificationRecipients" (message_id);
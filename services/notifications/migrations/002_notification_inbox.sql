@@ -0,0 +1,65 @@
+-- Move notifications to the shared-message model (see 001_notification_messages.sql).
+-- Adds per-recipient read state, copies the legacy "Notifications" rows into
+-- "NotificationMessages" / "NotificationRecipients", and exposes the joined rows
+-- through the notification_inbox view that the read services query.
+-- The legacy table is left in place; it is no longer written to.
+
+ALTER TABLE "NotificationRecipients" ADD COLUMN IF NOT EXISTS read_at timestamp;
+
+BEGIN;
+
+-- Legacy broadcasts wrote one row per recipient with near-identical timestamps;
+-- rows with the same sender, course, title, message and second become one message.
+CREATE TEMP TABLE legacy_messages ON COMMIT DROP AS
+SELECT
+    gen_random_uuid() AS message_id,
+    n.sender_id,
+    n.course_code,
+    n.title,
+    n.message,
+    date_trunc('second', n.created_at) AS sent_at,
+    min(n.created_at) AS created_at
+FROM "Notifications" n
+WHERE NOT EXISTS (
+    SELECT 1 FROM "NotificationRecipients" r WHERE r.notification_id = n.notification_id
+)
+GROUP BY n.sender_id, n.course_code, n.title, n.message, date_trunc('second', n.created_at);
+
+INSERT INTO "NotificationMessages" (message_id, sender_id, course_code, title, message, created_at)
+SELECT message_id, sender_id, course_code, title, message, created_at
+FROM legacy_messages;
+
+INSERT INTO "NotificationRecipients" (notification_id, message_id, recipient_id, created_at)
+SELECT n.notification_id, m.message_id, n.recipient_id, n.created_at
+FROM "Notifications" n
+JOIN legacy_messages m
+  ON m.sender_id = n.sender_id
+ AND m.course_code IS NOT DISTINCT FROM n.course_code
+ AND m.title = n.title
+ AND m.message = n.message
+ AND m.sent_at = date_trunc('second', n.created_at)
+ON CONFLICT (notification_id) DO NOTHING;
+
+COMMIT;
+
+-- Inbox and sender lookups
+CREATE INDEX IF NOT EXISTS notification_recipients_recipient_created_idx
+    ON "NotificationRecipients" (recipient_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS notification_messages_sender_created_idx
+    ON "NotificationMessages" (sender_id, created_at DESC);
+
+-- One row per delivered notification, in the shape of the legacy "Notifications" table
+CREATE OR REPLACE VIEW notification_inbox AS
+SELECT
+    r.notification_id,
+    r.message_id,
+    r.recipient_id,
+    m.sender_id,
+    m.course_code,
+    m.title,
+    m.message,
+    r.created_at,
+    r.read_at
+FROM "NotificationRecipients" r
+JOIN "NotificationMessages" m ON m.message_id = r.message_id;
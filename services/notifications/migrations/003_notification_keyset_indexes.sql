@@ -0,0 +1,15 @@
+-- Keyset pagination for the inbox and sent-items listings:
+-- ORDER BY created_at DESC, <id> DESC with a (created_at, id) cursor.
+
+DROP INDEX IF EXISTS notification_recipients_recipient_created_idx;
+CREATE INDEX IF NOT EXISTS notification_recipients_recipient_keyset_idx
+    ON "NotificationRecipients" (recipient_id, created_at DESC, notification_id DESC);
+
+DROP INDEX IF EXISTS notification_messages_sender_created_idx;
+CREATE INDEX IF NOT EXISTS notification_messages_sender_keyset_idx
+    ON "NotificationMessages" (sender_id, created_at DESC, message_id DESC);
+
+-- Unread counts only touch unread rows
+CREATE INDEX IF NOT EXISTS notification_recipients_unread_idx
+    ON "NotificationRecipients" (recipient_id)
+    WHERE read_at IS NULL;
@@ -0,0 +1,26 @@
+-- One row per sent message with its delivery and read counts, for the admin listing
+-- and admin details.
+-- The counts are computed per message with a lateral aggregate, so a page of
+-- messages only touches the recipient rows of those messages.
+
+CREATE INDEX IF NOT EXISTS notification_recipients_message_read_idx
+    ON "NotificationRecipients" (message_id, read_at);
+
+DROP INDEX IF EXISTS notification_recipients_message_id_idx;
+
+CREATE OR REPLACE VIEW notification_message_stats AS
+SELECT
+    m.message_id,
+    m.sender_id,
+    m.course_code,
+    m.title,
+    m.message,
+    m.created_at,
+    s.recipient_count,
+    s.read_count
+FROM "NotificationMessages" m
+CROSS JOIN LATERAL (
+    SELECT count(*) AS recipient_count, count(r.read_at) AS read_count
+    FROM "NotificationRecipients" r
+    WHERE r.message_id = m.message_id
+) s;
@@ -0,0 +1,91 @@
+"""
+Startup and per-check cost of exam time parsing: the previous pandas-based
+to_timestamp against the cached time.fromisoformat parser in crud.exam_crud.
+
+Measures
+  * import time of pandas vs. the datetime/functools modules the parser needs
+    (fresh interpreter per sample), and
+  * latency of parsing the start/end times of a busy exam day, as one clash check does.
+
+The pandas rows are skipped when pandas is not installed.
+
+Run from services/schedule-manager:
+    python -m benchmarks.time_parsing_benchmark --exams 200 --checks 2000
+"""
+import argparse
+import random
+import statistics
+import subprocess
+import sys
+import time
+from unittest import mock
+
+# crud.exam_crud imports the Supabase client; the parser does not need it
+sys.modules.setdefault("database", mock.MagicMock())
+from crud.exam_crud import parse_time, to_timestamp  # noqa: E402
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def pandas_to_timestamp(value: str):
+    # The implementation this benchmark replaces (minus its per-call print)
+    if len(value) <= 8:
+        value = f"1970-01-01T{value}"
+    return pd.to_datetime(value.replace("Z", "+00:00")).tz_localize(None).time()
+
+
+def import_seconds(module: str, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        output = subprocess.run(
+            [sys.executable, "-c", f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        timings.append(float(output))
+    return statistics.median(timings)
+
+
+def check_latency(parse, exam_times: list[tuple[str, str]], checks: int) -> float:
+    timings = []
+    for _ in range(checks):
+        started = time.perf_counter()
+        for start, end in exam_times:
+            parse(start)
+            parse(end)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exams", type=int, default=200, help="exams on the day being checked")
+    parser.add_argument("--checks", type=int, default=2000, help="clash checks to time")
+    parser.add_argument("--import-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    # Exams start on the hour or half hour, as stored by Postgres
+    starts = [f"{hour:02d}:{minute:02d}:00" for hour in range(8, 18) for minute in (0, 30)]
+    exam_times = []
+    for _ in range(args.exams):
+        start = random.choice(starts)
+        exam_times.append((start, f"{int(start[:2]) + 2:02d}{start[2:]}"))
+
+    print("Import time (median of fresh interpreters)")
+    print(f"  datetime + functools: {import_seconds('datetime, functools', args.import_samples) * 1000:8.1f} ms")
+    if pd is not None:
+        print(f"  pandas:               {import_seconds('pandas', args.import_samples) * 1000:8.1f} ms")
+
+    print(f"Parsing {args.exams} exams' start/end times per check (median of {args.checks} checks)")
+    parse_time.cache_clear()
+    print(f"  to_timestamp (cached fromisoformat): {check_latency(to_timestamp, exam_times, args.checks) * 1e6:10.1f} µs")
+    print(f"  parse cache: {parse_time.cache_info()}")
+    if pd is not None:
+        checks = max(1, args.checks // 20)
+        print(f"  pandas to_datetime ({checks} checks):  {check_latency(pandas_to_timestamp, exam_times, checks) * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark for the exam timetable solver on synthetic instances.
+
+Students belong to programmes; each takes several core courses of their programme
+plus a few electives from anywhere, which gives a realistic conflict graph
+(dense cliques per programme, sparse cross-programme edges). Reports construction
+quality (DSatur) and the result after local search within the time budget.
+
+Run from services/schedule-manager:
+    python -m benchmarks.timetable_solver_benchmark --courses 500 --students 20000 --budget 30
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from itertools import combinations
+
+from solver.timetable_solver import TimetableSolver
+
+# Programmes per faculty; electives are taken within the faculty
+FACULTY_SIZE = 2
+
+
+def synthetic_instance(courses: int, students: int, programmes: int, core: int, electives: int,
+                       days: int, slots_per_day: int, rooms: int, seed: int):
+    rng = random.Random(seed)
+    programme_courses = [list(range(p, courses, programmes)) for p in range(programmes)]
+
+    sizes = [0] * courses
+    pairs = Counter()
+    for _ in range(students):
+        programme = rng.randrange(programmes)
+        own = programme_courses[programme]
+        taken = set(rng.sample(own, min(core, len(own))))
+        # Electives come from the programmes of the same faculty
+        faculty = programme - programme % FACULTY_SIZE
+        faculty_courses = [c for p in range(faculty, min(faculty + FACULTY_SIZE, programmes)) for c in programme_courses[p]]
+        taken.update(rng.sample(faculty_courses, electives))
+        for course in taken:
+            sizes[course] += 1
+        pairs.update(combinations(sorted(taken), 2))
+
+    conflicts: dict[int, dict[int, int]] = {}
+    for (a, b), shared in pairs.items():
+        conflicts.setdefault(a, {})[b] = shared
+        conflicts.setdefault(b, {})[a] = shared
+
+    # Three-hour sessions starting at 09:00, 13:00 and 17:00 (seconds of day)
+    starts = [9 * 3600 + i * 4 * 3600 for i in range(slots_per_day)]
+    slots = [(day, start, start + 3 * 3600) for day in range(days) for start in starts]
+
+    # A few halls that fit any course, the rest sized like typical courses
+    halls = max(1, rooms // 4)
+    capacities = [max(sizes)] * halls + [rng.choice(sorted(sizes)[len(sizes) // 4:]) for _ in range(rooms - halls)]
+    return sizes, conflicts, slots, capacities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--programmes", type=int, default=40)
+    parser.add_argument("--core", type=int, default=5, help="core courses per student")
+    parser.add_argument("--electives", type=int, default=1, help="electives per student")
+    parser.add_argument("--days", type=int, default=15)
+    parser.add_argument("--slots-per-day", type=int, default=3)
+    parser.add_argument("--rooms", type=int, default=24)
+    parser.add_argument("--budget", type=float, default=30.0, help="solver time budget in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    sizes, conflicts, slots, rooms = synthetic_instance(
+        args.courses, args.students, args.programmes, args.core, args.electives,
+        args.days, args.slots_per_day, args.rooms, args.seed,
+    )
+    edges = sum(len(n) for n in conflicts.values()) // 2
+    print(f"Instance: {args.courses} courses, {args.students} students, {edges} conflict edges, "
+          f"{len(slots)} slots, {len(rooms)} rooms (built in {time.perf_counter() - started:.1f}s)")
+
+    solver = TimetableSolver(sizes, conflicts, slots, rooms, seed=args.seed)
+    result = solver.solve(args.budget)
+
+    # Independent check of the hard constraints
+    slot_of, room_of = result["slot_of"], result["room_of"]
+    for course, others in conflicts.items():
+        for other in others:
+            assert slot_of[course] < 0 or slot_of[course] != slot_of[other], f"clash between {course} and {other}"
+    used = Counter((slot_of[c], room_of[c]) for c in range(len(sizes)) if slot_of[c] >= 0)
+    assert all(count == 1 for count in used.values()), "room used twice in a slot"
+    assert all(rooms[room_of[c]] >= sizes[c] for c in range(len(sizes)) if slot_of[c] >= 0), "room too small"
+
+    construction = result["construction"]
+    print(f"DSatur:       {construction['unscheduled']} unscheduled, {construction['same_day_conflicts']} same-day student conflicts")
+    print(f"Local search: {len(result['unscheduled'])} unscheduled, {result['same_day_conflicts']} same-day student conflicts "
+          f"({result['iterations']} iterations)")
+    print(f"Total solve time: {result['elapsed_seconds']}s (budget {args.budget}s)")
+
+
+if __name__ == "__main__":
+    main()
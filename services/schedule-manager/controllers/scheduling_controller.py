@@ -1,10 +1,13 @@
+import asyncio
+from controllers.single_flight import SingleFlight, request_key
 from crud.assignment_crud import (
     create_assignment,
+    create_assignments,
     get_assignment_by_id,
     get_all_assignments,
+    list_assignments,
     update_assignment,
     delete_assignment,
-    serialize_assignment_data,
 )
 
 from crud.exam_crud import (
@@ -13,50 +16,87 @@ from crud.exam_crud import (
     create_exam,
     get_exam_by_id,
     get_all_exams,
+    list_exams,
     update_exam,
     delete_exam,
-    serialize_exam_data,
 )
+from crud.upcoming_index import get_upcoming_for_student, upcoming_limit
+from crud.exam_batch import schedule_exams_batch, plan_exam_timetable
+from models.exam import ExamBatchRequest, TimetablePlanRequest
+from pydantic import ValidationError
+
+# Read-only actions: identical concurrent requests share one backend call
+READ_ACTIONS = {
+    "getAssignment",
+    "getAllAssignments",
+    "listAssignments",
+    "getExam",
+    "getAllExams",
+    "listExams",
+    "getUpcomingForStudent",
+}
+
+single_flight = SingleFlight()
+
+# Messages are handled as concurrent tasks, but only reads overlap: writes run one
+# at a time, in arrival order, so their clash checks and inserts never interleave.
+# The HTTP exam write routes take the same lock
+write_lock = asyncio.Lock()
 
 
 async def handle_schedule_message(action: str, payload: dict):
     print(f"📨 Received action: {action}, payload: {payload}")
 
+    if action in READ_ACTIONS:
+        return await single_flight.do(request_key(action, payload), lambda: dispatch(action, payload))
+    async with write_lock:
+        return await dispatch(action, payload)
+
+
+async def dispatch(action: str, payload: dict):
     if action == "scheduleAssignment":
-        created = create_assignment(payload)
+        created = await create_assignment(payload)
         if not created:
             return {"error": "Assignment creation failed."}
         return {"message": "Assignment created successfully."}
 
+    elif action == "scheduleAssignments":
+        results = await create_assignments(payload.get("assignments", []))
+        created = sum(1 for r in results if r["status"] == "created")
+        return {"message": f"{created} of {len(results)} assignments created.", "results": results}
+
     elif action == "getAssignment":
         assignment_id = payload.get("assignment_id")
-        assignment = get_assignment_by_id(assignment_id)
+        assignment = await get_assignment_by_id(assignment_id)
         if not assignment:
             return {"error": "Assignment not found."}
-        return serialize_assignment_data(assignment)
+        return assignment
 
     elif action == "getAllAssignments":
-        assignments = get_all_assignments()
-        return [serialize_assignment_data(a) for a in assignments]
+        assignments = await get_all_assignments()
+        return assignments
+
+    elif action == "listAssignments":
+        return await list_assignments(payload or {})
 
     elif action == "updateAssignment":
         assignment_id = payload.get("assignment_id")
         updated_data = payload.get("assignment", {})
-        updated = update_assignment(assignment_id, updated_data)
+        updated = await update_assignment(assignment_id, updated_data)
         if not updated:
             return {"error": "Assignment not found or update failed."}
         return {"message": "Assignment updated successfully."}
 
     elif action == "deleteAssignment":
         assignment_id = payload.get("assignment_id")
-        deleted = delete_assignment(assignment_id)
+        deleted = await delete_assignment(assignment_id)
         if not deleted:
             return {"error": "Assignment not found or delete failed."}
         return {"message": "Assignment deleted successfully."}
 
     elif action == "scheduleExam":
         exam = payload.get("exam")
-        clash = check_exam_clash(
+        clash = await check_exam_clash(
             course_code=exam["course_code"],
             exam_date=exam["exam_date"],
             start_time=exam["start_time"],
@@ -65,26 +105,53 @@ async def handle_schedule_message(action: str, payload: dict):
         if clash:
             return {"error": "Exam clash detected! Group already has an exam at that time."}
 
-        created = create_exam(exam)
+        created = await create_exam(exam)
         if not created:
             return {"error": "Exam creation failed."}
         return {"message": "Exam scheduled successfully."}
 
+    elif action == "scheduleExamsBatch":
+        try:
+            batch = ExamBatchRequest(**payload)
+        except ValidationError as ve:
+            return {"error": "Invalid exam timetable.", "details": ve.errors()}
+
+        result = await schedule_exams_batch([exam.model_dump() for exam in batch.exams])
+        if result["clashes"]:
+            return {"error": "Exam clashes detected! No exams were scheduled.", "clashes": result["clashes"]}
+        return {"message": f"{result['scheduled']} exams scheduled successfully.", "exams": result.get("exams", [])}
+
+    elif action == "planExamTimetable":
+        try:
+            plan = TimetablePlanRequest(**payload)
+        except ValidationError as ve:
+            return {"error": "Invalid timetable request.", "details": ve.errors()}
+
+        return await plan_exam_timetable(
+            plan.course_codes,
+            [slot.model_dump() for slot in plan.slots],
+            [room.model_dump() for room in plan.rooms],
+            plan.time_budget_seconds,
+        )
+
     elif action == "getExam":
         exam_id = payload.get("exam_id")
-        exam = get_exam_by_id(exam_id)
+        exam = await get_exam_by_id(exam_id)
         if not exam:
             return {"error": "Exam not found."}
-        return serialize_exam_data(exam)
+        return exam
 
     elif action == "getAllExams":
-        exams = get_all_exams()
-        return [serialize_exam_data(e) for e in exams]
+        exams = await get_all_exams()
+        return exams
+
+    elif action == "listExams":
+        return await list_exams(payload or {})
 
     elif action == "updateExam":
         exam_id = payload.get("exam_id")
         update_data = payload.get("exam", {})
-        existing_exam = get_exam_by_id(exam_id)
+        existing_exam = await get_exam_by_id(exam_id)
         if not existing_exam:
             return {"error": "Exam not found."}
 
@@ -94,7 +161,7 @@ async def handle_schedule_message(action: str, payload: dict):
         start_time = update_data.get("start_time", existing_exam["start_time"])
         end_time = update_data.get("end_time", existing_exam["end_time"])
 
-        clash = update_check_exam_clash(
+        clash = await update_check_exam_clash(
             exam_id=exam_id,
             course_code=course_code,
             exam_date=exam_date,
@@ -104,18 +171,25 @@ async def handle_schedule_message(action: str, payload: dict):
         if clash:
             return {"error": "Exam clash detected during update!"}
 
-        updated = update_exam(exam_id, update_data)
+        updated = await update_exam(exam_id, update_data)
         if not updated:
             return {"error": "Exam update failed."}
         return {"message": "Exam updated successfully."}
 
     elif action == "deleteExam":
         exam_id = payload.get("exam_id")
-        deleted = delete_exam(exam_id)
+        deleted = await delete_exam(exam_id)
         if not deleted:
             return {"error": "Exam not found or delete failed."}
         return {"message": "Exam deleted successfully."}
 
+    elif action == "getUpcomingForStudent":
+        reg_number = payload.get("reg_number")
+        if not reg_number:
+            return {"error": "reg_number is required."}
+        items = await get_upcoming_for_student(reg_number, upcoming_limit(payload))
+        return {"items": items}
+
     else:
         print(f"❌ Unknown action received. action: {action}")
         return {"error": f"Unknown action: {action}"}
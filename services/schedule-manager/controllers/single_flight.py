@@ -0,0 +1,34 @@
+import asyncio
+import copy
+import json
+
+
+def request_key(action: str, data: dict | None) -> str:
+    """
+    Build a stable key for an action and its payload (dict order does not matter).
+    """
+    return f"{action}:{json.dumps(data or {}, sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for a key is in flight,
+    later callers with the same key wait for it and share its result (or error).
+    Each caller gets its own deep copy of the result, so one caller mutating it
+    cannot change what the others see.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn):
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        return copy.deepcopy(await asyncio.shield(future))
+
+    def _forget(self, key: str, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
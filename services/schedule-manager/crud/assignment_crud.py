@@ -1,52 +1,29 @@
 from datetime import datetime, date
 import datetime
+import asyncio
 from fastapi import HTTPException
 from uuid import UUID
-from database import supabase
+from database import get_supabase
 from postgrest.exceptions import APIError
+from rabbitMQ.codec import jsonable
+from models.assignment import AssignmentCreateRequest
+from pydantic import ValidationError
+from crud.listing import ASSIGNMENT_LISTING, list_rows
+from crud.upcoming_index import upcoming_index, ASSIGNMENT
+from scheduler.reminder_scheduler import reminder_scheduler
 
-def serialize_assignment_data(data: dict) -> dict:
-    """
-    Convert datetime, date, and UUID objects to serializable formats.
-    """
-    for key, value in data.items():
-        if isinstance(value, datetime.time):
-            data[key] = value.isoformat()
-        elif isinstance(value, datetime.date):
-            data[key] = value.isoformat()
-        elif isinstance(value, UUID):
-            data[key] = str(value)
-    return data
-
-# def serialize_exam_data(data: dict) -> dict:
-#     """
-#     Convert time, date, and UUID objects to serializable formats.
-#     """
-#     for key, value in data.items():
-#         # If the value is a time object
-#         if isinstance(value, datetime.time):
-#             # Convert time object to a string (ISO format)
-#             data[key] = value.isoformat()
-        
-#         # If the value is a date object
-#         elif isinstance(value, datetime.date):
-#             # Convert date object to a string (ISO format)
-#             data[key] = value.isoformat()
-        
-#         # If the value is a UUID object
-#         elif isinstance(value, UUID):
-#             data[key] = str(value)  # Convert UUID to string
-    
-#     return data
-
-def create_assignment(data: dict):
+async def create_assignment(data: dict):
     try:
-        updated_data = serialize_assignment_data(data)
+        updated_data = jsonable(data)
         print("Serialized assignment data:", updated_data)
 
-        response = supabase.table("Assignments").insert(updated_data).execute()
+        supabase = await get_supabase()
+        response = await supabase.table("Assignments").insert(updated_data).execute()
         
         if response.data:
+            for assignment in response.data:
+                upcoming_index.put(ASSIGNMENT, assignment)
+                reminder_scheduler.schedule(ASSIGNMENT, assignment)
             return response.data
         return None
 
@@ -70,23 +47,87 @@ def create_assignment(data: dict):
                 detail=f"Unexpected API error: {e.message}"
             )
 
-def get_assignment_by_id(assignment_id: str):
-    response = supabase.table("Assignments").select("*").eq("assignment_id", assignment_id).single().execute()
+async def create_assignments(rows: list[dict]) -> list[dict]:
+    """
+    Create many assignments in one insert. Course codes and assigned_by ids are
+    validated for the whole batch with one set query each (run concurrently); rows
+    that fail validation are reported and skipped. Returns one result per input row.
+    """
+    results = [{"index": i, "status": "pending"} for i in range(len(rows))]
+    valid = []
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, jsonable(AssignmentCreateRequest(**row).model_dump())))
+        except ValidationError as ve:
+            results[i] = {"index": i, "status": "invalid", "message": "Invalid assignment.", "details": ve.errors()}
+
+    if not valid:
+        return results
+
+    course_codes = list({row["course_code"] for _, row in valid})
+    faculty_ids = list({row["assigned_by"] for _, row in valid})
+    supabase = await get_supabase()
+    courses, faculty = await asyncio.gather(
+        supabase.table("Courses").select("course_code").in_("course_code", course_codes).execute(),
+        supabase.table("faculty_member_profiles").select("UID").in_("UID", faculty_ids).execute(),
+    )
+    known_courses = {c["course_code"] for c in courses.data}
+    known_faculty = {f["UID"] for f in faculty.data}
+
+    to_insert = []
+    for i, row in valid:
+        if row["course_code"] not in known_courses:
+            results[i] = {"index": i, "status": "invalid", "message": "Invalid course_code: The provided course does not exist."}
+        elif row["assigned_by"] not in known_faculty:
+            results[i] = {"index": i, "status": "invalid", "message": "Unauthorized: The faculty member (assigned_by) does not exist or is invalid."}
+        else:
+            to_insert.append((i, row))
+
+    if not to_insert:
+        return results
+
+    try:
+        response = await supabase.table("Assignments").insert([row for _, row in to_insert]).execute()
+    except APIError as e:
+        print("APIError:", e)
+        for i, _ in to_insert:
+            results[i] = {"index": i, "status": "error", "message": f"Database constraint error: {e.message}"}
+        return results
+
+    # Rows come back in insert order
+    for (i, _), created in zip(to_insert, response.data):
+        upcoming_index.put(ASSIGNMENT, created)
+        reminder_scheduler.schedule(ASSIGNMENT, created)
+        results[i] = {"index": i, "status": "created", "assignment_id": created["assignment_id"]}
+    print(f"✅ Created {len(response.data)} of {len(rows)} assignments")
+    return results
+
+async def get_assignment_by_id(assignment_id: str):
+    supabase = await get_supabase()
+    response = await supabase.table("Assignments").select("*").eq("assignment_id", assignment_id).single().execute()
     return response.data
 
-def get_all_assignments():
-    response = supabase.table("Assignments").select("*").execute()
+async def get_all_assignments():
+    supabase = await get_supabase()
+    response = await supabase.table("Assignments").select("*").execute()
     return response.data
 
-def update_assignment(assignment_id: str, update_data: dict):
+async def list_assignments(filters: dict):
+    return await list_rows(ASSIGNMENT_LISTING, filters)
+
+async def update_assignment(assignment_id: str, update_data: dict):
     try:
         print("Update data:", update_data)
-        updated_data = serialize_assignment_data(update_data)
+        updated_data = jsonable(update_data)
         print("Serialized update data:", updated_data)
 
-        response = supabase.table("Assignments").update(updated_data).eq("assignment_id", assignment_id).execute()
+        supabase = await get_supabase()
+        response = await supabase.table("Assignments").update(updated_data).eq("assignment_id", assignment_id).execute()
         
         if response.data:
+            for assignment in response.data:
+                upcoming_index.put(ASSIGNMENT, assignment)
+                reminder_scheduler.schedule(ASSIGNMENT, assignment)
             return response.data
         return None
 
@@ -107,10 +148,14 @@ def update_assignment(assignment_id: str, update_data: dict):
                 detail=f"Database constraint error: {e.message}"
             )
 
-def delete_assignment(assignment_id: str):
+async def delete_assignment(assignment_id: str):
     try:
-        response = supabase.table("Assignments").delete().eq("assignment_id", assignment_id).execute()
+        supabase = await get_supabase()
+        response = await supabase.table("Assignments").delete().eq("assignment_id", assignment_id).execute()
         if response.data:
+            for assignment in response.data:
+                upcoming_index.remove(ASSIGNMENT, assignment["assignment_id"])
+                reminder_scheduler.cancel(ASSIGNMENT, assignment["assignment_id"])
             return response.data
         return None
 
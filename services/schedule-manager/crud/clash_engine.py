@@ -0,0 +1,165 @@
+import asyncio
+import time
+from database import get_supabase
+from config import ROSTER_CACHE_TTL_SECONDS, ROSTER_PAGE_SIZE
+
+
+class RosterCache:
+    """
+    Enrolment rosters per course, kept as bitsets over a shared student index.
+
+    Every reg_number seen gets a fixed bit position, so the students two courses
+    have in common are `roster(a) & roster(b)`. Courses that are missing or older
+    than `ttl` seconds are fetched with one query each, all running concurrently;
+    a course already being fetched is awaited rather than queried again.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._student_bits: dict[str, int] = {}
+        self._students: list[str] = []
+        self._rosters: dict[str, tuple[int, float]] = {}
+        self._loading: dict[str, asyncio.Future] = {}
+
+    def _bit(self, reg_number: str) -> int:
+        bit = self._student_bits.get(reg_number)
+        if bit is None:
+            bit = self._student_bits[reg_number] = len(self._students)
+            self._students.append(reg_number)
+        return bit
+
+    async def _fetch(self, course_code: str) -> int:
+        supabase = await get_supabase()
+        roster, offset = 0, 0
+        while True:
+            # Paged, so a course larger than the API's max rows per response is read in full
+            response = await (
+                supabase.table("Enrollments")
+                .select("reg_number")
+                .eq("course_code", course_code)
+                .order("reg_number")
+                .range(offset, offset + ROSTER_PAGE_SIZE - 1)
+                .execute()
+            )
+            for row in response.data:
+                roster |= 1 << self._bit(row["reg_number"])
+            if len(response.data) < ROSTER_PAGE_SIZE:
+                break
+            offset += ROSTER_PAGE_SIZE
+        self._rosters[course_code] = (roster, time.monotonic())
+        return roster
+
+    def _load(self, course_code: str) -> asyncio.Future:
+        future = self._loading.get(course_code)
+        if future is None:
+            future = self._loading[course_code] = asyncio.ensure_future(self._fetch(course_code))
+            future.add_done_callback(lambda _: self._loading.pop(course_code, None))
+        return future
+
+    async def rosters(self, course_codes) -> dict[str, int]:
+        now = time.monotonic()
+        result, missing = {}, []
+        for course_code in set(course_codes):
+            entry = self._rosters.get(course_code)
+            if entry is None or now - entry[1] > self.ttl:
+                missing.append(course_code)
+            else:
+                result[course_code] = entry[0]
+
+        if missing:
+            # The per-course queries are independent, so they share the round trip
+            loaded = await asyncio.gather(*(asyncio.shield(self._load(c)) for c in missing))
+            result.update(zip(missing, loaded))
+
+        return result
+
+    def students(self, roster: int) -> list[str]:
+        """reg_numbers of the students in a roster bitset."""
+        students = []
+        while roster:
+            low = roster & -roster
+            students.append(self._students[low.bit_length() - 1])
+            roster ^= low
+        return students
+
+    def invalidate(self, course_code: str | None = None):
+        if course_code is None:
+            self._rosters.clear()
+        else:
+            self._rosters.pop(course_code, None)
+
+
+class ExamIntervals:
+    """
+    A day's exams as a static interval tree: the exams sorted by start time form an
+    implicit balanced tree (the subtree over [lo, hi) is rooted at (lo + hi) // 2)
+    whose nodes also keep the latest end time in their subtree. `overlapping(start,
+    end)` skips every subtree that ends before `start` or starts after `end`, so it
+    costs O(log n + k) for k overlapping exams.
+    """
+
+    def __init__(self, intervals: list[tuple]):
+        # intervals: (start, end, exam)
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._max_end = [None] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def _build(self, lo: int, hi: int):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._intervals[mid][1]
+        for child_end in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child_end is not None and child_end > max_end:
+                max_end = child_end
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end) -> list[dict]:
+        found = []
+        self._collect(0, len(self._intervals), start, end, found)
+        return found
+
+    def _collect(self, lo: int, hi: int, start, end, found: list[dict]):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < start:
+            # Every exam in this subtree ends before the interval starts
+            return
+        self._collect(lo, mid, start, end, found)
+        exam_start, exam_end, exam = self._intervals[mid]
+        if exam_start > end:
+            # This exam and the later-starting right subtree begin after the interval
+            return
+        if exam_end >= start:
+            found.append(exam)
+        self._collect(mid + 1, hi, start, end, found)
+
+
+async def find_clash(course_code: str, start, end, day: ExamIntervals) -> dict | None:
+    """
+    Return the first exam that clashes with an exam for `course_code` in [start, end]:
+    an overlapping exam of the same course, or of a course sharing at least one student.
+    """
+    overlapping = day.overlapping(start, end)
+    if not overlapping:
+        return None
+
+    for exam in overlapping:
+        if exam["course_code"] == course_code:
+            print("Clash: Same course")
+            return exam
+
+    rosters = await roster_cache.rosters([course_code] + [exam["course_code"] for exam in overlapping])
+    new_students = rosters[course_code]
+    if not new_students:
+        return None
+    for exam in overlapping:
+        if rosters[exam["course_code"]] & new_students:
+            print("Clash: Students enrolled in both courses")
+            return exam
+    return None
+
+
+roster_cache = RosterCache(ROSTER_CACHE_TTL_SECONDS)
@@ -0,0 +1,191 @@
+import asyncio
+import numpy as np
+from crud.clash_engine import roster_cache
+from crud.exam_crud import to_timestamp, create_exam
+from crud.exam_calendar import exam_calendar, date_key
+from solver.timetable_solver import TimetableSolver
+from config import TIMETABLE_SOLVER_TIME_BUDGET_SECONDS
+
+
+def seconds_of_day(value) -> int:
+    value = to_timestamp(value)
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def incidence_matrix(course_codes: list[str], rosters: dict[str, int]) -> np.ndarray:
+    """
+    Course x student 0/1 matrix built from the roster bitsets
+    (column j is bit j of the shared student index).
+    """
+    width = max((roster.bit_length() for roster in rosters.values()), default=0)
+    nbytes = (width + 7) // 8
+    matrix = np.zeros((len(course_codes), nbytes * 8), dtype=np.float32)
+    for row, course_code in enumerate(course_codes):
+        packed = np.frombuffer(rosters[course_code].to_bytes(nbytes, "little"), dtype=np.uint8)
+        matrix[row] = np.unpackbits(packed, bitorder="little")
+    return matrix
+
+
+async def find_batch_clashes(exams: list[dict]) -> list[dict]:
+    """
+    All clashes in a proposed timetable, including against exams already scheduled
+    on the same dates. Two exams clash when their times overlap on the same date and
+    they are for the same course or share at least one enrolled student.
+    """
+    dates = sorted({str(exam["exam_date"]) for exam in exams})
+    date_index = {exam_date: i for i, exam_date in enumerate(dates)}
+    existing = [exam for exam_date in dates for exam in await exam_calendar.on_date(exam_date)]
+    print(f"Checking {len(exams)} new exams against {len(existing)} scheduled on {len(dates)} days")
+
+    everything = exams + existing
+    new_count = len(exams)
+
+    course_codes = sorted({exam["course_code"] for exam in everything})
+    course_index = {course_code: i for i, course_code in enumerate(course_codes)}
+    courses = np.array([course_index[exam["course_code"]] for exam in everything])
+    days = np.array([date_index[str(exam["exam_date"])] for exam in everything])
+    starts = np.array([seconds_of_day(exam["start_time"]) for exam in everything])
+    ends = np.array([seconds_of_day(exam["end_time"]) for exam in everything])
+
+    # Students shared by every pair of courses, then by every pair of exams
+    incidence = incidence_matrix(course_codes, await roster_cache.rosters(course_codes))
+    shared_by_course = (incidence @ incidence.T).astype(np.int64)
+    shared = shared_by_course[courses[:, None], courses[None, :]]
+
+    overlap = (
+        (days[:, None] == days[None, :])
+        & (starts[:, None] <= ends[None, :])
+        & (starts[None, :] <= ends[:, None])
+    )
+    same_course = courses[:, None] == courses[None, :]
+    clashing = overlap & (same_course | (shared > 0))
+
+    # Each pair once, and only pairs involving at least one new exam
+    pairs = np.argwhere(np.triu(clashing, k=1))
+    pairs = pairs[pairs[:, 0] < new_count]
+
+    clashes = []
+    for i, j in pairs:
+        other = everything[j]
+        clashes.append({
+            "index": int(i),
+            "course_code": exams[i]["course_code"],
+            "clashes_with": {"index": int(j)} if j < new_count else {"exam_id": other["exam_id"]},
+            "clashing_course_code": other["course_code"],
+            "shared_students": int(shared[i, j]),
+            "reason": "same_course" if same_course[i, j] else "shared_students",
+        })
+    return clashes
+
+
+async def schedule_exams_batch(exams: list[dict]) -> dict:
+    """
+    Check a whole exam timetable at once; insert every exam in one request if
+    there are no clashes, otherwise insert nothing and return the clash report.
+    """
+    if not exams:
+        return {"scheduled": 0, "clashes": []}
+
+    clashes = await find_batch_clashes(exams)
+    if clashes:
+        print(f"❌ {len(clashes)} clashes found, nothing scheduled")
+        return {"scheduled": 0, "clashes": clashes}
+
+    created = await create_exam(exams)
+    print(f"✅ Scheduled {len(created or [])} exams")
+    return {"scheduled": len(created or []), "clashes": [], "exams": created}
+
+
+def conflict_graph(course_codes: list[str], rosters: dict[str, int]) -> tuple[list[int], np.ndarray]:
+    """Students per course and the course x course shared-student counts."""
+    incidence = incidence_matrix(course_codes, rosters)
+    sizes = incidence.sum(axis=1).astype(np.int64)
+    shared = (incidence @ incidence.T).astype(np.int64)
+    return [int(size) for size in sizes], shared
+
+
+async def plan_exam_timetable(course_codes: list[str], slots: list[dict], rooms: list[dict],
+                        time_budget: float = TIMETABLE_SOLVER_TIME_BUDGET_SECONDS) -> dict:
+    """
+    Propose a clash-free exam timetable for `course_codes` using the given slots
+    ({exam_date, start_time, end_time}) and rooms ({location, capacity}).
+    Exams already in the calendar are respected: a course does not get a slot that
+    overlaps an exam of its own or of a course sharing its students, and a room is
+    not used in a slot that overlaps an exam already held in it.
+    Nothing is written; the result can be submitted with scheduleExamsBatch.
+    """
+    course_codes = list(dict.fromkeys(course_codes))
+    solver_slots = [
+        (date_key(slot["exam_date"]), seconds_of_day(slot["start_time"]), seconds_of_day(slot["end_time"]))
+        for slot in slots
+    ]
+
+    # Scheduled exams overlapping each slot (touching ends count, as in find_batch_clashes)
+    existing_by_date = {day: await exam_calendar.on_date(day) for day in {day for day, _, _ in solver_slots}}
+    overlapping = [
+        [
+            exam for exam in existing_by_date[day]
+            if seconds_of_day(exam["start_time"]) <= end and start <= seconds_of_day(exam["end_time"])
+        ]
+        for day, start, end in solver_slots
+    ]
+
+    # Rosters of the planned courses, then of the courses already sitting in those slots
+    all_codes = course_codes + sorted(
+        {exam["course_code"] for exams in overlapping for exam in exams} - set(course_codes)
+    )
+    course_index = {course_code: i for i, course_code in enumerate(all_codes)}
+    sizes, shared = conflict_graph(all_codes, await roster_cache.rosters(all_codes))
+
+    planned = len(course_codes)
+    conflicts: dict[int, dict[int, int]] = {}
+    for i, j in np.argwhere(shared[:planned, :planned] > 0):
+        if i != j:
+            conflicts.setdefault(int(i), {})[int(j)] = int(shared[i, j])
+
+    unavailable: dict[int, set[int]] = {}
+    room_index = {room["location"]: r for r, room in enumerate(rooms)}
+    taken_rooms: dict[int, set[int]] = {}
+    for slot, exams in enumerate(overlapping):
+        for exam in exams:
+            other = course_index[exam["course_code"]]
+            for course in range(planned):
+                if course == other or shared[course, other] > 0:
+                    unavailable.setdefault(course, set()).add(slot)
+            if exam.get("location") in room_index:
+                taken_rooms.setdefault(slot, set()).add(room_index[exam["location"]])
+
+    solver = TimetableSolver(
+        sizes[:planned],
+        conflicts,
+        solver_slots,
+        [room.get("capacity") for room in rooms],
+        unavailable=unavailable,
+        taken_rooms=taken_rooms,
+    )
+    # The search is CPU-bound for up to `time_budget` seconds; keep it off the event loop
+    result = await asyncio.to_thread(solver.solve, time_budget)
+
+    timetable = []
+    for course, course_code in enumerate(course_codes):
+        slot = result["slot_of"][course]
+        if slot < 0:
+            continue
+        room = result["room_of"][course]
+        timetable.append({
+            "course_code": course_code,
+            "exam_date": str(slots[slot]["exam_date"]),
+            "start_time": str(slots[slot]["start_time"]),
+            "end_time": str(slots[slot]["end_time"]),
+            "location": rooms[room]["location"] if room >= 0 else None,
+            "students": sizes[course],
+        })
+
+    print(f"✅ Planned {len(timetable)} of {len(course_codes)} exams in {result['elapsed_seconds']}s")
+    return {
+        "timetable": timetable,
+        "unscheduled": [course_codes[course] for course in result["unscheduled"]],
+        "same_day_conflicts": result["same_day_conflicts"],
+        "iterations": result["iterations"],
+        "elapsed_seconds": result["elapsed_seconds"],
+    }
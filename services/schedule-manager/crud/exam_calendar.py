@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+import threading
+from database import fetch_all
+from config import EXAM_CALENDAR_RECONCILE_SECONDS
+
+
+def date_key(value) -> datetime.date:
+    """
+    The calendar day of a date or timestamp ("2025-05-01", "2025-05-01T00:00:00Z",
+    a date object), so every spelling of a day indexes to the same key.
+    """
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+class ExamCalendar:
+    """
+    In-memory copy of the Exams table, indexed by exam_id, exam_date and course_code.
+
+    create/update/delete write through with `put()` / `remove()`, so reads and clash
+    checks do not go to the database. The first read loads the table;
+    `reconcile_forever()` reloads it every EXAM_CALENDAR_RECONCILE_SECONDS to pick up
+    changes made elsewhere, and writes that happen while a reload is in flight are
+    replayed on top of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id: dict[str, dict] = {}
+        self._by_date: dict[datetime.date, dict[str, dict]] = {}
+        self._by_course: dict[str, dict[str, dict]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._journal: list[tuple[str, object]] | None = None  # writes during a reload
+
+    def _index(self, exam: dict):
+        exam_id = str(exam["exam_id"])
+        self._unindex(exam_id)
+        self._by_id[exam_id] = exam
+        self._by_date.setdefault(date_key(exam["exam_date"]), {})[exam_id] = exam
+        self._by_course.setdefault(exam["course_code"], {})[exam_id] = exam
+
+    def _unindex(self, exam_id: str):
+        exam = self._by_id.pop(exam_id, None)
+        if exam is None:
+            return
+        for index, key in ((self._by_date, date_key(exam["exam_date"])), (self._by_course, exam["course_code"])):
+            exams = index.get(key)
+            if exams is not None:
+                exams.pop(exam_id, None)
+                if not exams:
+                    del index[key]
+
+    async def load(self):
+        with self._lock:
+            self._journal = []
+        try:
+            exams = await fetch_all(lambda supabase: supabase.table("Exams").select("*").order("exam_id"))
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._by_id, self._by_date, self._by_course = {}, {}, {}
+            for exam in exams:
+                self._index(exam)
+            for operation, value in journal:
+                if operation == "put":
+                    self._index(value)
+                else:
+                    self._unindex(value)
+            self._loaded = True
+        print(f"📅 Exam calendar loaded: {len(self._by_id)} exams")
+
+    async def _ensure_loaded(self):
+        # Concurrent first reads wait for one load; reloads take the same lock
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self.load()
+
+    def put(self, exam: dict):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("put", exam))
+            self._index(exam)
+
+    def remove(self, exam_id: str):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("remove", str(exam_id)))
+            self._unindex(str(exam_id))
+
+    async def all(self) -> list[dict]:
+        await self._ensure_loaded()
+        with self._lock:
+            return list(self._by_id.values())
+
+    async def get(self, exam_id: str) -> dict | None:
+        await self._ensure_loaded()
+        return self._by_id.get(str(exam_id))
+
+    async def on_date(self, exam_date) -> list[dict]:
+        await self._ensure_loaded()
+        with self._lock:
+            return list(self._by_date.get(date_key(exam_date), {}).values())
+
+    async def for_course(self, course_code: str) -> list[dict]:
+        await self._ensure_loaded()
+        with self._lock:
+            return list(self._by_course.get(course_code, {}).values())
+
+    async def reconcile_forever(self, interval: float = EXAM_CALENDAR_RECONCILE_SECONDS):
+        while True:
+            try:
+                async with self._load_lock:
+                    await self.load()
+            except Exception as e:
+                print(f"⚠️ Exam calendar reconciliation failed: {e}")
+            await asyncio.sleep(interval)
+
+
+exam_calendar = ExamCalendar()
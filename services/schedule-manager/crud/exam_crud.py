@@ -1,190 +1,88 @@
-import pandas as pd
-from datetime import datetime, time
 import datetime
+from functools import lru_cache
 from fastapi import HTTPException
-import json
-import time
-from uuid import UUID
-from database import supabase
+from database import get_supabase
 from postgrest.exceptions import APIError
-from dateutil.parser import parse
+from rabbitMQ.codec import jsonable
+from crud.clash_engine import ExamIntervals, find_clash
+from crud.exam_calendar import exam_calendar
+from crud.listing import EXAM_LISTING, list_cached_rows
+from crud.upcoming_index import upcoming_index, EXAM
+from scheduler.reminder_scheduler import reminder_scheduler
 
-def serialize_exam_data(data: dict) -> dict:
+
+@lru_cache(maxsize=4096)
+def parse_time(value: str) -> datetime.time:
     """
-    Convert time, date, and UUID objects to serializable formats.
+    Naive time of day from a time ("06:08:42", "06:08:42+00") or datetime
+    ("2025-01-01T06:08:42Z") string. Exams reuse a handful of distinct times,
+    so results are cached.
     """
-    for key, value in data.items():
-        # If the value is a time object
-        if isinstance(value, datetime.time):
-            # Convert time object to a string (ISO format)
-            data[key] = value.isoformat()
-        
-        # If the value is a date object
-        elif isinstance(value, datetime.date):
-            # Convert date object to a string (ISO format)
-            data[key] = value.isoformat()
-        
-        # If the value is a UUID object
-        elif isinstance(value, UUID):
-            data[key] = str(value)  # Convert UUID to string
-    
-    return data
+    if "T" in value:
+        return datetime.datetime.fromisoformat(value).time()
+    return datetime.time.fromisoformat(value).replace(tzinfo=None)
 
-def to_timestamp(value):
-    print("Value type:", type(value))
 
-    # If it's already a pandas Timestamp, return the time portion, removing any timezone info
-    if isinstance(value, pd.Timestamp):
-        return value.tz_localize(None).time()  # Strip timezone and return only the time part
-
-    # If it's a string
+def to_timestamp(value):
     if isinstance(value, str):
-        if len(value) <= 8:  # Just a time like "06:08:42"
-            value = f"1970-01-01T{value}"
-        # Convert to datetime, remove timezone info, then return the time part
-        return pd.to_datetime(value.replace("Z", "+00:00")).tz_localize(None).time()
-
-    # If it's a datetime.time object, just return it (naive)
-    if isinstance(value, datetime.time):
-        return value
+        return parse_time(value)
 
-    # If it's a datetime.datetime object, remove the timezone and return the time portion
     if isinstance(value, datetime.datetime):
         return value.replace(tzinfo=None).time()
 
-    return None
-
-
-def check_exam_clash(course_code: str, exam_date: str, start_time: str, end_time: str):
-    print("Checking clashes for:", exam_date)
-    
-    # Fetch all exams on the given exam_date
-    response = supabase.table("Exams").select("*").eq("exam_date", exam_date).execute()
-    exams = response.data
-    print("Exams on same day:", exams)
-
-    if not exams:
-        return False
-
-    input_start = to_timestamp(start_time)
-    input_end = to_timestamp(end_time)
+    if isinstance(value, datetime.time):
+        return value.replace(tzinfo=None)
 
-    # Ensure naive datetimes
-    if input_start.tzinfo is not None:
-        input_start = input_start.replace(tzinfo=None)
-    if input_end.tzinfo is not None:
-        input_end = input_end.replace(tzinfo=None)
+    return None
 
-    for exam in exams:
-        exam_start = to_timestamp(exam["start_time"])
-        exam_end = to_timestamp(exam["end_time"])
-       
-        if exam_start.tzinfo is not None:
-            exam_start = exam_start.replace(tzinfo=None)
-        if exam_end.tzinfo is not None:
-            exam_end = exam_end.replace(tzinfo=None)
 
-        # Check for overlapping times
-        if input_start <= exam_end and exam_start <= input_end:
-            print("Found overlapping exam:", exam)
-            
-            if exam["course_code"] == course_code:
-                # Same course, same time = direct clash
-                print("Clash: Same course")
-                return True
+async def exams_on_day(exam_date, exclude_exam_id: str | None = None) -> ExamIntervals:
+    """Index the exams on `exam_date` (from the calendar cache) by time."""
+    exams = [
+        exam for exam in await exam_calendar.on_date(exam_date)
+        if exclude_exam_id is None or str(exam["exam_id"]) != str(exclude_exam_id)
+    ]
+    print(f"Exams on same day: {len(exams)}")
 
-            # Get students for the existing exam course
-            existing_students_resp = supabase.table("Enrollments").select("reg_number").eq("course_code", exam["course_code"]).execute()
-            existing_students = {s["reg_number"] for s in existing_students_resp.data}
+    return ExamIntervals([
+        (to_timestamp(exam["start_time"]), to_timestamp(exam["end_time"]), exam)
+        for exam in exams
+    ])
 
-            # Get students for the new exam course
-            new_course_students_resp = supabase.table("Enrollments").select("reg_number").eq("course_code", course_code).execute()
-            new_students = {s["reg_number"] for s in new_course_students_resp.data}
 
-            # Check for intersection
-            if existing_students & new_students:
-                print("Clash: Students enrolled in both courses")
-                return True
+async def check_exam_clash(course_code: str, exam_date: str, start_time: str, end_time: str):
+    print("Checking clashes for:", exam_date)
 
-    return False
+    clash = await find_clash(course_code, to_timestamp(start_time), to_timestamp(end_time), await exams_on_day(exam_date))
+    if clash:
+        print("Found clashing exam:", clash)
+    return clash is not None
 
-def update_check_exam_clash(exam_id: str, course_code: str, exam_date: str, start_time: str, end_time: str):
+async def update_check_exam_clash(exam_id: str, course_code: str, exam_date: str, start_time: str, end_time: str):
     print("Checking update clashes for:", exam_date)
 
-    # Fetch all exams on the given exam_date, excluding the one being updated
-    response = (
-        supabase.table("Exams")
-        .select("*")
-        .eq("exam_date", exam_date)
-        .neq("exam_id", exam_id)
-        .execute()
-    )
-    exams = response.data
-    print("Exams on same day (excluding self):", exams)
-
-    if not exams:
-        return False
-
-    input_start = to_timestamp(start_time)
-    input_end = to_timestamp(end_time)
-
-    # Ensure naive datetimes
-    if input_start.tzinfo is not None:
-        input_start = input_start.replace(tzinfo=None)
-    if input_end.tzinfo is not None:
-        input_end = input_end.replace(tzinfo=None)
-
-    for exam in exams:
-        exam_start = to_timestamp(exam["start_time"])
-        exam_end = to_timestamp(exam["end_time"])
-
-        if exam_start.tzinfo is not None:
-            exam_start = exam_start.replace(tzinfo=None)
-        if exam_end.tzinfo is not None:
-            exam_end = exam_end.replace(tzinfo=None)
-
-        # Check for overlapping times
-        if input_start <= exam_end and exam_start <= input_end:
-            print("Found overlapping exam:", exam)
-
-            if exam["course_code"] == course_code:
-                print("Clash: Same course")
-                return True
-
-            # Get students for the existing exam course
-            existing_students_resp = (
-                supabase.table("Enrollments")
-                .select("reg_number")
-                .eq("course_code", exam["course_code"])
-                .execute()
-            )
-            existing_students = {s["reg_number"] for s in existing_students_resp.data}
-
-            # Get students for the new exam course
-            new_course_students_resp = (
-                supabase.table("Enrollments")
-                .select("reg_number")
-                .eq("course_code", course_code)
-                .execute()
-            )
-            new_students = {s["reg_number"] for s in new_course_students_resp.data}
-
-            # Check for intersection
-            if existing_students & new_students:
-                print("Clash: Students enrolled in both courses")
-                return True
-
-    return False
+    # Exclude the exam being updated
+    day = await exams_on_day(exam_date, exclude_exam_id=exam_id)
+    clash = await find_clash(course_code, to_timestamp(start_time), to_timestamp(end_time), day)
+    if clash:
+        print("Found clashing exam:", clash)
+    return clash is not None
 
 
 
-def create_exam(data: dict):
+async def create_exam(data: dict | list[dict]):
     try:
-        updated_data = serialize_exam_data(data)
+        # A list is inserted in one request, so either every exam is created or none is
+        updated_data = [jsonable(exam) for exam in data] if isinstance(data, list) else jsonable(data)
         print("Serialized data:", updated_data)
-        response = supabase.table("Exams").insert(updated_data).execute()
+        supabase = await get_supabase()
+        response = await supabase.table("Exams").insert(updated_data).execute()
         
         if response.data:
+            for exam in response.data:
+                exam_calendar.put(exam)
+                upcoming_index.put(EXAM, exam)
+                reminder_scheduler.schedule(EXAM, exam)
             return response.data
         
         return None
@@ -215,23 +113,38 @@ def create_exam(data: dict):
         
 
 
-def get_exam_by_id(exam_id: str):
-    response = supabase.table("Exams").select("*").eq("exam_id", exam_id).single().execute()
-    return response.data
+async def get_exam_by_id(exam_id: str):
+    exam = await exam_calendar.get(exam_id)
+    if exam is not None:
+        return exam
 
-def get_all_exams():
-    response = supabase.table("Exams").select("*").execute()
+    # Not seen yet (e.g. created by another instance since the last reconciliation)
+    supabase = await get_supabase()
+    response = await supabase.table("Exams").select("*").eq("exam_id", exam_id).single().execute()
+    if response.data:
+        exam_calendar.put(response.data)
     return response.data
 
-def update_exam(exam_id: str, update_data: dict):
+async def get_all_exams():
+    return await exam_calendar.all()
+
+async def list_exams(filters: dict):
+    return list_cached_rows(EXAM_LISTING, await exam_calendar.all(), filters)
+
+async def update_exam(exam_id: str, update_data: dict):
     try:
         print("Update data:", update_data)
-        updated_data = serialize_exam_data(update_data)
+        updated_data = jsonable(update_data)
         print("Serialized update data:", updated_data)
 
-        response = supabase.table("Exams").update(updated_data).eq("exam_id", exam_id).execute()
+        supabase = await get_supabase()
+        response = await supabase.table("Exams").update(updated_data).eq("exam_id", exam_id).execute()
         
         if response.data:
+            for exam in response.data:
+                exam_calendar.put(exam)
+                upcoming_index.put(EXAM, exam)
+                reminder_scheduler.schedule(EXAM, exam)
             return response.data
         return None
     
@@ -256,8 +169,13 @@ def update_exam(exam_id: str, update_data: dict):
                 detail=f"Database constraint error: {e.message}"
             )
         
-def delete_exam(exam_id: str):
-    response = supabase.table("Exams").delete().eq("exam_id", exam_id).execute()
+async def delete_exam(exam_id: str):
+    supabase = await get_supabase()
+    response = await supabase.table("Exams").delete().eq("exam_id", exam_id).execute()
     if response.data:
+        for exam in response.data:
+            exam_calendar.remove(exam["exam_id"])
+            upcoming_index.remove(EXAM, exam["exam_id"])
+            reminder_scheduler.cancel(EXAM, exam["exam_id"])
         return response.data
     return None
@@ -0,0 +1,145 @@
+from database import get_supabase
+from config import LISTING_PAGE_SIZE, LISTING_MAX_PAGE_SIZE
+
+CURSOR_SEPARATOR = "|"
+
+# Columns a listing may return, the default list-view projection, the keyset
+# order and the filterable date / faculty columns per table
+EXAM_LISTING = {
+    "table": "Exams",
+    "columns": {"exam_id", "title", "description", "course_code", "exam_date", "start_time", "end_time",
+                "location", "scheduled_by", "notified"},
+    "default_columns": ["exam_id", "title", "course_code", "exam_date", "start_time", "end_time", "location"],
+    "order": ["exam_date", "start_time", "exam_id"],
+    "date_column": "exam_date",
+    "faculty_column": "scheduled_by",
+}
+
+ASSIGNMENT_LISTING = {
+    "table": "Assignments",
+    "columns": {"assignment_id", "title", "description", "course_code", "due_date", "due_time",
+                "attachment_url", "assigned_by", "notified"},
+    "default_columns": ["assignment_id", "title", "course_code", "due_date", "due_time", "attachment_url"],
+    "order": ["due_date", "due_time", "assignment_id"],
+    "date_column": "due_date",
+    "faculty_column": "assigned_by",
+}
+
+
+def page_size(filters: dict) -> int:
+    try:
+        limit = int(filters.get("limit") or LISTING_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = LISTING_PAGE_SIZE
+    return max(1, min(limit, LISTING_MAX_PAGE_SIZE))
+
+
+def projection(listing: dict, columns: list[str] | None) -> list[str]:
+    """Requested columns that exist, plus the keyset columns the cursor needs."""
+    selected = [c for c in (columns or listing["default_columns"]) if c in listing["columns"]]
+    return selected + [c for c in listing["order"] if c not in selected]
+
+
+def sort_key(listing: dict, row: dict) -> tuple:
+    return tuple(str(row[c]) for c in listing["order"])
+
+
+def encode_cursor(listing: dict, row: dict) -> str:
+    return CURSOR_SEPARATOR.join(sort_key(listing, row))
+
+
+def decode_cursor(listing: dict, cursor) -> tuple:
+    values = tuple(str(cursor).split(CURSOR_SEPARATOR))
+    if len(values) != len(listing["order"]):
+        raise ValueError("Invalid cursor.")
+    return values
+
+
+def course_code_filter(filters: dict) -> list[str]:
+    """The course_codes filter as a list; a single code may be given as a string."""
+    course_codes = filters.get("course_codes") or []
+    if isinstance(course_codes, str):
+        return [course_codes]
+    if not isinstance(course_codes, list):
+        raise ValueError("course_codes must be a list of course codes.")
+    return [str(course_code) for course_code in course_codes]
+
+
+def page(listing: dict, rows: list[dict], limit: int) -> dict:
+    if len(rows) <= limit:
+        return {"items": rows, "next_cursor": None}
+    rows = rows[:limit]
+    return {"items": rows, "next_cursor": encode_cursor(listing, rows[-1])}
+
+
+async def list_rows(listing: dict, filters: dict) -> dict:
+    """
+    One page of a table filtered by course_codes, date_from/date_to (inclusive) and
+    faculty, ordered by the listing's keyset and projected to the requested columns.
+    """
+    limit = page_size(filters)
+    columns = projection(listing, filters.get("columns"))
+    try:
+        course_codes = course_code_filter(filters)
+        after = decode_cursor(listing, filters["cursor"]) if filters.get("cursor") else None
+    except ValueError as e:
+        return {"error": str(e)}
+
+    supabase = await get_supabase()
+    query = supabase.table(listing["table"]).select(", ".join(columns))
+
+    if course_codes:
+        query = query.in_("course_code", course_codes)
+    if filters.get("date_from"):
+        query = query.gte(listing["date_column"], str(filters["date_from"]))
+    if filters.get("date_to"):
+        query = query.lte(listing["date_column"], str(filters["date_to"]))
+    if filters.get("faculty"):
+        query = query.eq(listing["faculty_column"], str(filters["faculty"]))
+
+    if after:
+        # (a, b, id) > (x, y, z) written as a PostgREST or-filter
+        order = listing["order"]
+        branches = []
+        for i, column in enumerate(order):
+            equal = [f'{order[j]}.eq."{after[j]}"' for j in range(i)]
+            greater = f'{column}.gt."{after[i]}"'
+            branches.append(f"and({','.join(equal + [greater])})" if equal else greater)
+        query = query.or_(",".join(branches))
+
+    for column in listing["order"]:
+        query = query.order(column)
+    rows = (await query.limit(limit + 1).execute()).data
+    return page(listing, rows, limit)
+
+
+def list_cached_rows(listing: dict, rows: list[dict], filters: dict) -> dict:
+    """Same filtering, ordering and paging as list_rows, over rows already in memory."""
+    limit = page_size(filters)
+    columns = projection(listing, filters.get("columns"))
+    try:
+        course_codes = set(course_code_filter(filters))
+        after = decode_cursor(listing, filters["cursor"]) if filters.get("cursor") else None
+    except ValueError as e:
+        return {"error": str(e)}
+    date_from = str(filters["date_from"]) if filters.get("date_from") else None
+    date_to = str(filters["date_to"]) if filters.get("date_to") else None
+    faculty = str(filters["faculty"]) if filters.get("faculty") else None
+
+    matching = []
+    for row in rows:
+        row_date = str(row[listing["date_column"]])
+        if course_codes and row["course_code"] not in course_codes:
+            continue
+        if date_from and row_date < date_from:
+            continue
+        if date_to and row_date > date_to:
+            continue
+        if faculty and str(row[listing["faculty_column"]]) != faculty:
+            continue
+        if after and sort_key(listing, row) <= after:
+            continue
+        matching.append(row)
+
+    matching.sort(key=lambda row: sort_key(listing, row))
+    return page(listing, [{c: row.get(c) for c in columns} for row in matching[:limit + 1]], limit)
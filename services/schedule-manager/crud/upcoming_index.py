@@ -0,0 +1,169 @@
+import asyncio
+import datetime
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import islice
+from database import fetch_all, get_supabase
+from config import UPCOMING_INDEX_RECONCILE_SECONDS, UPCOMING_LIMIT, UPCOMING_MAX_LIMIT
+from crud.exam_calendar import exam_calendar
+
+EXAM = "exam"
+ASSIGNMENT = "assignment"
+
+
+def exam_item(exam: dict) -> tuple[tuple, dict]:
+    item = {
+        "type": EXAM,
+        "exam_id": exam["exam_id"],
+        "title": exam.get("title"),
+        "course_code": exam["course_code"],
+        "exam_date": str(exam["exam_date"]),
+        "start_time": str(exam["start_time"]),
+        "end_time": str(exam["end_time"]),
+        "location": exam.get("location"),
+    }
+    return (item["exam_date"], item["start_time"], EXAM, str(exam["exam_id"])), item
+
+
+def assignment_item(assignment: dict) -> tuple[tuple, dict]:
+    item = {
+        "type": ASSIGNMENT,
+        "assignment_id": assignment["assignment_id"],
+        "title": assignment.get("title"),
+        "course_code": assignment["course_code"],
+        "due_date": str(assignment["due_date"]),
+        "due_time": str(assignment["due_time"]),
+        "attachment_url": assignment.get("attachment_url"),
+    }
+    return (item["due_date"], item["due_time"], ASSIGNMENT, str(assignment["assignment_id"])), item
+
+
+class UpcomingIndex:
+    """
+    Upcoming exams and assignments per course_code, each list kept sorted by
+    (date, time). `put()` / `remove()` keep it current as exams and assignments are
+    written; `reconcile_forever()` rebuilds it periodically, which also drops items
+    that are now in the past. Writes during a rebuild are replayed on top of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_course: dict[str, list[tuple]] = {}
+        self._keys: dict[tuple[str, str], tuple[str, tuple]] = {}  # (kind, id) -> (course_code, sort key)
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._journal: list[tuple] | None = None
+
+    def _add(self, kind: str, row: dict):
+        key, item = exam_item(row) if kind == EXAM else assignment_item(row)
+        self._discard(kind, key[3])
+        insort(self._by_course.setdefault(item["course_code"], []), (key, item), key=lambda entry: entry[0])
+        self._keys[(kind, key[3])] = (item["course_code"], key)
+
+    def _discard(self, kind: str, row_id: str):
+        entry = self._keys.pop((kind, row_id), None)
+        if entry is None:
+            return
+        course_code, key = entry
+        items = self._by_course.get(course_code, [])
+        position = bisect_left(items, key, key=lambda entry: entry[0])
+        if position < len(items) and items[position][0] == key:
+            del items[position]
+
+    async def load(self):
+        with self._lock:
+            self._journal = []
+        today = datetime.date.today().isoformat()
+        try:
+            exams, assignments = await asyncio.gather(
+                exam_calendar.all(),
+                fetch_all(lambda supabase: (
+                    supabase.table("Assignments").select("*").gte("due_date", today).order("assignment_id")
+                )),
+            )
+            exams = [exam for exam in exams if str(exam["exam_date"]) >= today]
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._by_course, self._keys = {}, {}
+            for exam in exams:
+                self._add(EXAM, exam)
+            for assignment in assignments:
+                self._add(ASSIGNMENT, assignment)
+            for operation, kind, value in journal:
+                if operation == "put":
+                    self._add(kind, value)
+                else:
+                    self._discard(kind, value)
+            self._loaded = True
+        print(f"📅 Upcoming index loaded: {len(exams)} exams, {len(assignments)} assignments")
+
+    def put(self, kind: str, row: dict):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("put", kind, row))
+            if self._loaded or self._journal is not None:
+                self._add(kind, row)
+
+    def remove(self, kind: str, row_id):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(("remove", kind, str(row_id)))
+            self._discard(kind, str(row_id))
+
+    async def upcoming(self, course_codes, limit: int) -> list[dict]:
+        """The next `limit` items across `course_codes`, merged from the per-course lists."""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self.load()
+
+        # Sort keys start with (date, time) strings, so this bisects to the first item
+        # starting (or due) now or later, including earlier today
+        now = datetime.datetime.now()
+        cutoff = (now.date().isoformat(), now.time().isoformat(timespec="seconds"))
+        with self._lock:
+            streams = []
+            for course_code in set(course_codes):
+                items = self._by_course.get(course_code)
+                if items:
+                    # Skip items already in the past; the next rebuild removes them
+                    streams.append(items[bisect_left(items, cutoff, key=lambda entry: entry[0]):])
+        merged = heapq.merge(*streams, key=lambda entry: entry[0])
+        return [item for _, item in islice(merged, limit)]
+
+    async def reconcile_forever(self, interval: float = UPCOMING_INDEX_RECONCILE_SECONDS):
+        while True:
+            try:
+                async with self._load_lock:
+                    await self.load()
+            except Exception as e:
+                print(f"⚠️ Upcoming index rebuild failed: {e}")
+            await asyncio.sleep(interval)
+
+
+upcoming_index = UpcomingIndex()
+
+
+def upcoming_limit(payload: dict) -> int:
+    try:
+        limit = int(payload.get("limit") or UPCOMING_LIMIT)
+    except (TypeError, ValueError):
+        limit = UPCOMING_LIMIT
+    return max(1, min(limit, UPCOMING_MAX_LIMIT))
+
+
+async def get_upcoming_for_student(reg_number: str, limit: int = UPCOMING_LIMIT) -> list[dict]:
+    supabase = await get_supabase()
+    enrollments = (
+        await supabase.table("Enrollments")
+        .select("course_code")
+        .eq("reg_number", reg_number)
+        .execute()
+    ).data
+    return await upcoming_index.upcoming([row["course_code"] for row in enrollments], limit)
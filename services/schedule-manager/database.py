@@ -1,7 +1,41 @@
+import asyncio
 from decouple import config
-from supabase import create_client, Client
+from config import FETCH_PAGE_SIZE
+from supabase import acreate_client, AsyncClient
 
 url = config("SUPERBASE_URL")
 key = config("SUPABASE_KEY")
 
-supabase: Client = create_client(url, key)
+_supabase: AsyncClient | None = None
+_lock = asyncio.Lock()
+
+
+async def get_supabase() -> AsyncClient:
+    """
+    The shared async Supabase client, created on first use. Its PostgREST session
+    keeps one pooled HTTP/2 connection, so concurrent queries are multiplexed over
+    it instead of each holding a worker thread for its round trip.
+    """
+    global _supabase
+    if _supabase is None:
+        async with _lock:
+            if _supabase is None:
+                _supabase = await acreate_client(url, key)
+    return _supabase
+
+
+async def fetch_all(build_query) -> list[dict]:
+    """
+    Every row of a select query, read in pages of FETCH_PAGE_SIZE with `.range()` so
+    results larger than the API's max rows per response are not truncated.
+    `build_query(supabase)` returns the filtered, ordered select; it is called once
+    per page because the request builders are not reusable.
+    """
+    supabase = await get_supabase()
+    rows, offset = [], 0
+    while True:
+        page = (await build_query(supabase).range(offset, offset + FETCH_PAGE_SIZE - 1).execute()).data
+        rows += page
+        if len(page) < FETCH_PAGE_SIZE:
+            return rows
+        offset += FETCH_PAGE_SIZE
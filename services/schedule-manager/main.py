@@ -5,6 +5,9 @@ import asyncio
 from routers.exam_routes import router as exam_router
 from routers.assignment_routes import router as assignment_router
 from rabbitMQ.schedule_consumer import schedule_consume
+from crud.exam_calendar import exam_calendar
+from crud.upcoming_index import upcoming_index
+from scheduler.reminder_scheduler import reminder_scheduler
 
 app = FastAPI()
 
@@ -15,6 +18,9 @@ def read_root():
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(schedule_consume())
+    asyncio.create_task(exam_calendar.reconcile_forever())
+    asyncio.create_task(upcoming_index.reconcile_forever())
+    asyncio.create_task(reminder_scheduler.run())
 
 # Include routers
 app.include_router(exam_router, prefix="/api")
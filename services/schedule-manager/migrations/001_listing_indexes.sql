@@ -0,0 +1,14 @@
+-- Keyset pagination for listAssignments / listExams:
+-- ORDER BY <date>, <time>, <id> with optional course_code and faculty filters.
+
+CREATE INDEX IF NOT EXISTS assignments_due_keyset_idx
+    ON "Assignments" (due_date, due_time, assignment_id);
+
+CREATE INDEX IF NOT EXISTS assignments_course_due_idx
+    ON "Assignments" (course_code, due_date, due_time, assignment_id);
+
+CREATE INDEX IF NOT EXISTS assignments_assigned_by_due_idx
+    ON "Assignments" (assigned_by, due_date, due_time, assignment_id);
+
+CREATE INDEX IF NOT EXISTS exams_date_keyset_idx
+    ON "Exams" (exam_date, start_time, exam_id);
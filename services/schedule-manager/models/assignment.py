@@ -22,3 +22,7 @@ class AssignmentUpdateRequest(BaseModel):
     notified: Optional[bool] = None
     due_date: Optional[date] = None
     due_time: Optional[time] = None
+
+
+class AssignmentBatchRequest(BaseModel):
+    assignments: list[AssignmentCreateRequest]
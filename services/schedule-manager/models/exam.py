@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import date, time
 from typing import Optional
+from config import TIMETABLE_SOLVER_TIME_BUDGET_SECONDS
 
 class ExamCreateRequest(BaseModel):
     title: str
@@ -25,4 +26,26 @@ class ExamUpdateRequest(BaseModel):
     description: Optional[str] = None
     location: Optional[str] = None
     scheduled_by: Optional[UUID] = None
-    course_code: Optional[str] = None
\ No newline at end of file
+    course_code: Optional[str] = None
+
+
+class ExamBatchRequest(BaseModel):
+    exams: list[ExamCreateRequest]
+
+
+class ExamSlot(BaseModel):
+    exam_date: date
+    start_time: time
+    end_time: time
+
+
+class ExamRoom(BaseModel):
+    location: str
+    capacity: Optional[int] = Field(None, ge=1)
+
+
+class TimetablePlanRequest(BaseModel):
+    course_codes: list[str]
+    slots: list[ExamSlot]
+    rooms: list[ExamRoom] = []
+    time_budget_seconds: float = Field(TIMETABLE_SOLVER_TIME_BUDGET_SECONDS, gt=0, le=300)
@@ -0,0 +1,71 @@
+import datetime
+import json
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack replies are only offered when msgpack is installed
+    msgpack = None
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _default(value):
+    """
+    Convert values the encoders do not handle natively (datetime, UUID, pydantic models, numpy arrays).
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _is_msgpack(content_type: str | None) -> bool:
+    return msgpack is not None and content_type in MSGPACK_CONTENT_TYPES
+
+
+def decode(body: bytes, content_type: str | None = None):
+    """
+    Parse a message body according to its content_type (JSON when missing).
+    """
+    if content_type in MSGPACK_CONTENT_TYPES:
+        if msgpack is None:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        return msgpack.unpackb(body, raw=False)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body.decode())
+
+
+def encode(data, content_type: str | None = None) -> tuple[bytes, str]:
+    """
+    Serialize data, answering in MessagePack when the peer asked for it and JSON otherwise.
+    Returns the body together with the content_type actually used.
+    """
+    if _is_msgpack(content_type):
+        return msgpack.packb(data, default=_default, use_bin_type=True), content_type
+    if orjson is not None:
+        body = orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return body, JSON_CONTENT_TYPE
+    return json.dumps(data, default=_default, separators=(",", ":")).encode(), JSON_CONTENT_TYPE
+
+
+def jsonable(data: dict) -> dict:
+    """
+    Shallow copy of data with date, time and UUID values converted to JSON friendly strings.
+    """
+    return {
+        key: _default(value) if isinstance(value, (datetime.date, datetime.time, UUID)) else value
+        for key, value in data.items()
+    }
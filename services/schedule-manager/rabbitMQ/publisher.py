@@ -0,0 +1,34 @@
+import asyncio
+import aio_pika
+from config import RABBITMQ_URL
+from rabbitMQ.codec import encode
+
+_connection: aio_pika.abc.AbstractRobustConnection | None = None
+_channel: aio_pika.abc.AbstractChannel | None = None
+_lock = asyncio.Lock()
+
+
+async def _get_channel() -> aio_pika.abc.AbstractChannel:
+    global _connection, _channel
+    async with _lock:
+        if _channel is None or _channel.is_closed:
+            if _connection is None:
+                _connection = await aio_pika.connect_robust(RABBITMQ_URL)
+            _channel = await _connection.channel()
+        return _channel
+
+
+async def publish(queue_name: str, payload: dict):
+    """
+    Publish a persistent message to another service's queue without waiting for a reply.
+    """
+    channel = await _get_channel()
+    body, content_type = encode(payload)
+    await channel.default_exchange.publish(
+        aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        ),
+        routing_key=queue_name
+    )
@@ -1,44 +1,57 @@
 import aio_pika
 import asyncio
-import json
-from config import RABBITMQ_URL, SCHEDULE_QUEUE
+from config import RABBITMQ_URL, SCHEDULE_QUEUE, CONSUMER_PREFETCH_COUNT
+from rabbitMQ.codec import decode, encode
 from controllers.scheduling_controller import handle_schedule_message  # You will create this
 
+# Keep references to in-flight handlers so they are not garbage collected
+_tasks: set[asyncio.Task] = set()
+
 async def schedule_consume():
     connection = await aio_pika.connect_robust(RABBITMQ_URL)
     channel = await connection.channel()
+    # Handle up to CONSUMER_PREFETCH_COUNT messages concurrently (writes are still
+    # serialised by the controller)
+    await channel.set_qos(prefetch_count=CONSUMER_PREFETCH_COUNT)
     queue = await channel.declare_queue(SCHEDULE_QUEUE, durable=True)
     print("✅ Attendance consumer started...")
 
     async with queue.iterator() as queue_iter:
         async for message in queue_iter:
-            async with message.process():
-                payload = json.loads(message.body.decode())
-
-                action = payload.get("action")
-                data = payload.get("payload")
-
-                print(f"📨 Received action: {action}, payload: {data}")
-
-                try:
-                    result = await handle_schedule_message(action, data)
-                except Exception as e:
-                    result = {"error": str(e)}
-
-                # Reply back if needed
-                reply_to = message.reply_to
-                correlation_id = message.correlation_id
-
-                if reply_to and correlation_id:
-                    await channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=json.dumps({
-                                "status": "success" if "error" not in result else "error",
-                                "result": result
-                            }).encode(),
-                            correlation_id=correlation_id
-                        ),
-                        routing_key=reply_to
-                    )
-
-                print("✅ Response sent.")
+            task = asyncio.create_task(process_message(channel, message))
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+async def process_message(channel: aio_pika.abc.AbstractChannel, message: aio_pika.abc.AbstractIncomingMessage):
+    async with message.process():
+        payload = decode(message.body, message.content_type)
+
+        action = payload.get("action")
+        data = payload.get("payload")
+
+        print(f"📨 Received action: {action}, payload: {data}")
+
+        try:
+            result = await handle_schedule_message(action, data)
+        except Exception as e:
+            result = {"error": str(e)}
+
+        # Reply back if needed
+        reply_to = message.reply_to
+        correlation_id = message.correlation_id
+
+        if reply_to and correlation_id:
+            body, content_type = encode({
+                "status": "success" if "error" not in result else "error",
+                "result": result
+            }, message.content_type)
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=body,
+                    content_type=content_type,
+                    correlation_id=correlation_id
+                ),
+                routing_key=reply_to
+            )
+
+        print("✅ Response sent.")
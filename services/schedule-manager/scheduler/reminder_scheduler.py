@@ -0,0 +1,238 @@
+import asyncio
+import datetime
+import heapq
+import threading
+import time
+from database import fetch_all, get_supabase
+from config import (
+    SCHEDULING_NOTIFICATIONS_QUEUE,
+    EXAM_REMINDER_LEAD_SECONDS,
+    ASSIGNMENT_REMINDER_LEAD_SECONDS,
+    REMINDER_BATCH_WINDOW_SECONDS,
+    REMINDER_RETRY_SECONDS,
+)
+from crud.exam_calendar import exam_calendar
+from rabbitMQ.publisher import publish
+
+EXAM = "exam"
+ASSIGNMENT = "assignment"
+
+# Per kind: table, id column, faculty column, date / time columns and reminder lead
+REMINDER_SOURCES = {
+    EXAM: ("Exams", "exam_id", "scheduled_by", "exam_date", "start_time", EXAM_REMINDER_LEAD_SECONDS),
+    ASSIGNMENT: ("Assignments", "assignment_id", "assigned_by", "due_date", "due_time", ASSIGNMENT_REMINDER_LEAD_SECONDS),
+}
+
+
+def event_time(kind: str, row: dict) -> datetime.datetime:
+    _, _, _, date_column, time_column, _ = REMINDER_SOURCES[kind]
+    return datetime.datetime.combine(
+        datetime.date.fromisoformat(str(row[date_column])),
+        datetime.time.fromisoformat(str(row[time_column])).replace(tzinfo=None),
+    )
+
+
+class ReminderScheduler:
+    """
+    Sends a course-wide reminder before each exam and assignment deadline that has
+    not been notified yet.
+
+    Pending reminders sit in a min-heap keyed by reminder time; the scheduler sleeps
+    until the earliest one is due (or until `schedule()` / `cancel()` change the heap),
+    so the tables are only read once at startup. Reminders that fall due within
+    REMINDER_BATCH_WINDOW_SECONDS of each other go out as one batch on
+    SCHEDULING_NOTIFICATIONS_QUEUE. The batch is claimed first by setting `notified`
+    with one update per table, and handed back if the publish fails, so a retry
+    never sends a reminder twice (a crash between the two steps loses the batch
+    rather than duplicating it). Rescheduled or deleted rows are dropped lazily
+    from the heap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, int, str, str]] = []  # (remind_at, version, kind, id)
+        self._pending: dict[tuple[str, str], tuple[int, dict]] = {}  # (kind, id) -> (version, row)
+        self._version = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    def _wake(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _push(self, kind: str, row: dict, remind_at: float):
+        row_id = str(row[REMINDER_SOURCES[kind][1]])
+        self._version += 1
+        self._pending[(kind, row_id)] = (self._version, row)
+        heapq.heappush(self._heap, (remind_at, self._version, kind, row_id))
+
+    def schedule(self, kind: str, row: dict):
+        """(Re)schedule the reminder for a created or updated row; safe to call from any thread."""
+        row_id = str(row[REMINDER_SOURCES[kind][1]])
+        with self._lock:
+            if row.get("notified"):
+                self._pending.pop((kind, row_id), None)
+                return
+            at = event_time(kind, row)
+            if at <= datetime.datetime.now():
+                self._pending.pop((kind, row_id), None)
+                return
+            self._push(kind, row, at.timestamp() - REMINDER_SOURCES[kind][5])
+        self._wake()
+
+    def cancel(self, kind: str, row_id):
+        with self._lock:
+            self._pending.pop((kind, str(row_id)), None)
+        self._wake()
+
+    async def load(self):
+        today = datetime.date.today().isoformat()
+
+        def pending(table: str, id_column: str, date_column: str):
+            return lambda supabase: (
+                supabase.table(table)
+                .select("*")
+                .eq("notified", False)
+                .gte(date_column, today)
+                .order(id_column)
+            )
+
+        loaded = await asyncio.gather(*(
+            fetch_all(pending(table, id_column, date_column))
+            for table, id_column, _, date_column, _, _ in REMINDER_SOURCES.values()
+        ))
+        for kind, rows in zip(REMINDER_SOURCES, loaded):
+            for row in rows:
+                self.schedule(kind, row)
+            print(f"⏰ Loaded {len(rows)} pending {kind} reminders")
+
+    def _live_head(self) -> tuple | None:
+        # Drop cancelled or rescheduled entries sitting at the top of the heap
+        while self._heap:
+            remind_at, version, kind, row_id = self._heap[0]
+            entry = self._pending.get((kind, row_id))
+            if entry is not None and entry[0] == version:
+                return self._heap[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def _take_due(self) -> tuple[list[tuple[str, dict]], float | None]:
+        """Pop the due reminders plus any due within the batch window; also return the seconds until the next one."""
+        due = []
+        with self._lock:
+            now = time.time()
+            head = self._live_head()
+            if head is not None and head[0] <= now:
+                horizon = now + REMINDER_BATCH_WINDOW_SECONDS
+                while head is not None and head[0] <= horizon:
+                    _, _, kind, row_id = heapq.heappop(self._heap)
+                    due.append((kind, self._pending.pop((kind, row_id))[1]))
+                    head = self._live_head()
+            delay = max(0.0, head[0] - now) if head is not None else None
+        return due, delay
+
+    async def _faculty_reg_numbers(self, uids: set[str]) -> dict[str, str]:
+        supabase = await get_supabase()
+        response = await (
+            supabase.table("faculty_member_profiles")
+            .select("UID, reg_number")
+            .in_("UID", list(uids))
+            .execute()
+        )
+        return {str(row["UID"]): row["reg_number"] for row in response.data}
+
+    def _notification(self, kind: str, row: dict, senders: dict[str, str]) -> dict | None:
+        faculty_column = REMINDER_SOURCES[kind][2]
+        sender_id = senders.get(str(row.get(faculty_column)))
+        if sender_id is None:
+            return None
+        at = event_time(kind, row)
+        when = f"{at:%Y-%m-%d} at {at:%H:%M}"
+        if kind == EXAM:
+            message = f"Reminder: the {row['course_code']} exam \"{row['title']}\" is on {when}"
+            if row.get("location"):
+                message += f" in {row['location']}"
+        else:
+            message = f"Reminder: the {row['course_code']} assignment \"{row['title']}\" is due on {when}"
+        return {
+            "sender_id": sender_id,
+            "course_code": row["course_code"],
+            "title": f"Upcoming {kind}: {row['title']}",
+            "message": message + ".",
+        }
+
+    async def _set_notified(self, due: list[tuple[str, dict]], notified: bool):
+        supabase = await get_supabase()
+        updates = {}
+        for kind, (table, id_column, *_rest) in REMINDER_SOURCES.items():
+            ids = [str(row[id_column]) for k, row in due if k == kind]
+            if ids:
+                updates[kind] = supabase.table(table).update({"notified": notified}).in_(id_column, ids).execute()
+        responses = dict(zip(updates, await asyncio.gather(*updates.values())))
+        if EXAM in responses:
+            for exam in responses[EXAM].data:
+                exam_calendar.put(exam)
+
+    async def _send(self, due: list[tuple[str, dict]]):
+        senders = await self._faculty_reg_numbers(
+            {str(row.get(REMINDER_SOURCES[kind][2])) for kind, row in due}
+        )
+        notifications, claimed = [], []
+        for kind, row in due:
+            notification = self._notification(kind, row, senders)
+            if notification is None:
+                # Left with notified = false, so it is picked up again once the row is fixed
+                print(f"⚠️ No reg_number for the faculty member of {kind} {row[REMINDER_SOURCES[kind][1]]}; reminder not sent")
+                continue
+            notifications.append(notification)
+            claimed.append((kind, row))
+        if not claimed:
+            return
+
+        await self._set_notified(claimed, True)
+        try:
+            await publish(SCHEDULING_NOTIFICATIONS_QUEUE, {
+                "action": "addCourseNotificationsBatch",
+                "payload": {"notifications": notifications},
+            })
+        except Exception:
+            # Hand the batch back; `run()` retries it
+            await self._set_notified(claimed, False)
+            raise
+        print(f"⏰ Sent {len(notifications)} reminders ({len(due) - len(notifications)} without a known sender)")
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await self.load()
+                break
+            except Exception as e:
+                print(f"⚠️ Loading reminders failed: {e}")
+                await asyncio.sleep(REMINDER_RETRY_SECONDS)
+        print("✅ Reminder scheduler started...")
+
+        while True:
+            due, delay = self._take_due()
+            if due:
+                try:
+                    await self._send(due)
+                except Exception as e:
+                    print(f"⚠️ Sending {len(due)} reminders failed, retrying: {e}")
+                    with self._lock:
+                        for kind, row in due:
+                            # Unless the row was rescheduled or deleted in the meantime
+                            if (kind, str(row[REMINDER_SOURCES[kind][1]])) not in self._pending:
+                                self._push(kind, row, time.time() + REMINDER_RETRY_SECONDS)
+                continue
+
+            # Sleep until the next reminder is due or the heap changes
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+reminder_scheduler = ReminderScheduler()
@@ -0,0 +1,328 @@
+import random
+import time
+
+# Cost of leaving a course without a slot, far above any same-day penalty
+UNSCHEDULED_PENALTY = 10 ** 9
+
+
+class TimetableSolver:
+    """
+    Exam timetabling as graph colouring.
+
+    Courses are vertices, two courses conflict when they share students (edge weight =
+    number of shared students), and slots are colours. Hard constraints: conflicting
+    courses never sit in overlapping slots, and each exam gets a room that is free in
+    its slot and large enough for the course. Soft constraint: as few students as
+    possible with two exams on the same day.
+
+    `solve(time_budget)` builds a timetable with DSatur, then improves it with local
+    search (single-course moves, Kempe-chain moves, ejection of blockers for unplaced
+    courses and whole-slot swaps) until the budget runs out.
+
+    sizes:     students per course
+    conflicts: {course: {other_course: shared_students}}, symmetric
+    slots:     (day, start, end) per slot; start/end are comparable (e.g. seconds)
+    rooms:     capacity per room (None = unlimited); an empty list means rooms are not
+               constrained
+    unavailable: {course: slots it may not use}, e.g. slots overlapping an exam already
+               scheduled for the course or for a course sharing its students
+    taken_rooms: {slot: rooms already in use during it}
+
+    Slots overlap when their times intersect on the same day, touching ends included,
+    matching the clash checks the timetable is later submitted to.
+    """
+
+    def __init__(self, sizes: list[int], conflicts: dict[int, dict[int, int]], slots: list[tuple],
+                 rooms: list[int | None], seed: int = 0,
+                 unavailable: dict[int, set[int]] | None = None, taken_rooms: dict[int, set[int]] | None = None):
+        self.sizes = sizes
+        self.neighbours = [list(conflicts.get(c, {}).items()) for c in range(len(sizes))]
+        self.slot_day = [day for day, _, _ in slots]
+        days = sorted(set(self.slot_day))
+        self.day_index = {day: i for i, day in enumerate(days)}
+        self.slot_day = [self.day_index[day] for day in self.slot_day]
+        self.overlaps = [
+            [t for t, (day_t, start_t, end_t) in enumerate(slots) if day_t == day and start_t <= end and start <= end_t]
+            for day, start, end in slots
+        ]
+        # Rooms smallest first so the first free fit is the best fit
+        self.rooms = sorted(range(len(rooms)), key=lambda r: float("inf") if rooms[r] is None else rooms[r])
+        self.room_capacity = rooms
+        self.random = random.Random(seed)
+
+        courses, slot_count = len(sizes), len(slots)
+        self.slot_of = [-1] * courses
+        self.room_of = [-1] * courses
+        self.blocked = [[0] * slot_count for _ in range(courses)]  # conflicting neighbours in overlapping slots
+        self.saturation = [0] * courses                            # slots with blocked > 0
+        self.day_weight = [[0] * len(days) for _ in range(courses)]  # shared students already on each day
+        self.room_users = [dict() for _ in range(slot_count)]      # room -> course per slot
+        self.courses_in_slot = [set() for _ in range(slot_count)]
+        self.same_day_cost = 0
+        self.taken_rooms = [(taken_rooms or {}).get(slot, set()) for slot in range(slot_count)]
+        # Unavailable slots count as permanently blocked
+        for course, slots_out in (unavailable or {}).items():
+            for slot in slots_out:
+                if self.blocked[course][slot] == 0:
+                    self.saturation[course] += 1
+                self.blocked[course][slot] += 1
+
+    # --- state updates -------------------------------------------------------
+
+    def free_room(self, course: int, slot: int) -> int | None:
+        """Best-fitting free room for `course` in `slot`, -1 if rooms are unconstrained, None if none fits."""
+        if not self.rooms:
+            return -1
+        size = self.sizes[course]
+        for room in self.rooms:
+            capacity = self.room_capacity[room]
+            if capacity is not None and capacity < size:
+                continue
+            if room in self.taken_rooms[slot]:
+                continue
+            if all(room not in self.room_users[t] for t in self.overlaps[slot]):
+                return room
+        return None
+
+    def place(self, course: int, slot: int, room: int):
+        self.slot_of[course] = slot
+        self.room_of[course] = room
+        self.courses_in_slot[slot].add(course)
+        if room >= 0:
+            self.room_users[slot][room] = course
+        day = self.slot_day[slot]
+        self.same_day_cost += self.day_weight[course][day]
+        for other, weight in self.neighbours[course]:
+            self.day_weight[other][day] += weight
+            blocked = self.blocked[other]
+            for t in self.overlaps[slot]:
+                if blocked[t] == 0:
+                    self.saturation[other] += 1
+                blocked[t] += 1
+
+    def remove(self, course: int):
+        slot, room = self.slot_of[course], self.room_of[course]
+        day = self.slot_day[slot]
+        for other, weight in self.neighbours[course]:
+            self.day_weight[other][day] -= weight
+            blocked = self.blocked[other]
+            for t in self.overlaps[slot]:
+                blocked[t] -= 1
+                if blocked[t] == 0:
+                    self.saturation[other] -= 1
+        self.same_day_cost -= self.day_weight[course][day]
+        self.courses_in_slot[slot].discard(course)
+        if room >= 0:
+            del self.room_users[slot][room]
+        self.slot_of[course] = -1
+        self.room_of[course] = -1
+
+    def best_slot(self, course: int, exclude: int = -1) -> tuple[int, int] | None:
+        """Feasible (slot, room) with the fewest same-day shared students, or None."""
+        best, best_weight = None, None
+        weights = self.day_weight[course]
+        for slot, blocked in enumerate(self.blocked[course]):
+            if blocked or slot == exclude:
+                continue
+            weight = weights[self.slot_day[slot]]
+            if best_weight is not None and weight >= best_weight:
+                continue
+            room = self.free_room(course, slot)
+            if room is not None:
+                best, best_weight = (slot, room), weight
+                if weight == 0:
+                    break
+        return best
+
+    def cost(self) -> int:
+        return self.unscheduled_count() * UNSCHEDULED_PENALTY + self.same_day_cost
+
+    def unscheduled_count(self) -> int:
+        return sum(1 for slot in self.slot_of if slot < 0)
+
+    # --- construction --------------------------------------------------------
+
+    def dsatur(self):
+        """Colour the most constrained course first: highest saturation, then degree, then size."""
+        degree = [len(n) for n in self.neighbours]
+        pending = set(range(len(self.sizes)))
+        while pending:
+            course = max(pending, key=lambda c: (self.saturation[c], degree[c], self.sizes[c]))
+            pending.discard(course)
+            choice = self.best_slot(course)
+            if choice is not None:
+                self.place(course, *choice)
+
+    # --- local search --------------------------------------------------------
+
+    def place_with_ejection(self, course: int) -> bool:
+        """Try to place an unplaced course by moving the courses blocking one of its slots."""
+        slots = sorted(range(len(self.blocked[course])), key=lambda s: self.blocked[course][s])
+        for slot in slots:
+            blockers = {
+                other for other, _ in self.neighbours[course]
+                if self.slot_of[other] >= 0 and self.slot_of[other] in self.overlaps[slot]
+            }
+            moved = []
+            for other in blockers:
+                old = (self.slot_of[other], self.room_of[other])
+                self.remove(other)
+                # The blocker must not move into a slot that overlaps the target
+                choice = self.best_slot(other, exclude=slot)
+                if choice is None or choice[0] in self.overlaps[slot]:
+                    self.place(other, *old)
+                    break
+                self.place(other, *choice)
+                moved.append((other, old))
+            else:
+                room = self.free_room(course, slot)
+                if room is None and self.blocked[course][slot] == 0:
+                    room = self.free_room_by_moving(course, slot, moved)
+                if self.blocked[course][slot] == 0 and room is not None:
+                    self.place(course, slot, room)
+                    return True
+            # Undo the partial ejection
+            for other, old in reversed(moved):
+                self.remove(other)
+                self.place(other, *old)
+        return False
+
+    def free_room_by_moving(self, course: int, slot: int, moved: list) -> int | None:
+        """Free a large enough room in `slot` by moving its exam to another slot."""
+        size = self.sizes[course]
+        for room, occupant in list(self.room_users[slot].items()):
+            capacity = self.room_capacity[room]
+            if capacity is not None and capacity < size:
+                continue
+            old = (slot, room)
+            self.remove(occupant)
+            choice = self.best_slot(occupant, exclude=slot)
+            if choice is None or choice[0] in self.overlaps[slot]:
+                self.place(occupant, *old)
+                continue
+            self.place(occupant, *choice)
+            moved.append((occupant, old))
+            return self.free_room(course, slot)
+        return None
+
+    def improve_course(self, course: int) -> bool:
+        slot, room = self.slot_of[course], self.room_of[course]
+        current = self.day_weight[course][self.slot_day[slot]]
+        if current == 0:
+            return False
+        self.remove(course)
+        choice = self.best_slot(course, exclude=slot)
+        if choice is not None and self.day_weight[course][self.slot_day[choice[0]]] < current:
+            self.place(course, *choice)
+            return True
+        self.place(course, slot, room)
+        return False
+
+    def kempe_move(self, course: int, target: int) -> bool:
+        """
+        Move `course` to `target` together with its Kempe chain (the connected courses
+        alternating between its slot and `target`), which keeps the timetable clash-free;
+        keep it if the cost drops and every moved course still gets a room.
+        """
+        source = self.slot_of[course]
+        if source == target or self.overlaps[source] != [source] or self.overlaps[target] != [target]:
+            return False
+        chain, stack = {course}, [course]
+        while stack:
+            current = stack.pop()
+            other_slot = target if self.slot_of[current] == source else source
+            for other, _ in self.neighbours[current]:
+                if other not in chain and self.slot_of[other] == other_slot:
+                    chain.add(other)
+                    stack.append(other)
+
+        before = self.same_day_cost
+        old = [(c, self.slot_of[c], self.room_of[c]) for c in chain]
+        for c, _, _ in old:
+            self.remove(c)
+        placed = []
+        # Largest courses first so they get the big rooms
+        for c, slot, _ in sorted(old, key=lambda entry: -self.sizes[entry[0]]):
+            new_slot = target if slot == source else source
+            room = self.free_room(c, new_slot)
+            if room is None or self.blocked[c][new_slot]:
+                break
+            self.place(c, new_slot, room)
+            placed.append(c)
+        else:
+            if self.same_day_cost < before:
+                return True
+        for c in placed:
+            self.remove(c)
+        for c, slot, room in old:
+            self.place(c, slot, room)
+        return False
+
+    def swap_slots(self, a: int, b: int) -> bool:
+        """Exchange the contents of two slots that only overlap themselves; keep it if the cost drops."""
+        if self.overlaps[a] != [a] or self.overlaps[b] != [b]:
+            return False
+        before = self.same_day_cost
+        group_a = [(c, self.room_of[c]) for c in self.courses_in_slot[a]]
+        group_b = [(c, self.room_of[c]) for c in self.courses_in_slot[b]]
+        for c, _ in group_a + group_b:
+            self.remove(c)
+        # Each course must be allowed in the other slot, with its room free there
+        allowed = all(
+            not self.blocked[c][slot] and room not in self.taken_rooms[slot]
+            for group, slot in ((group_a, b), (group_b, a))
+            for c, room in group
+        )
+        if allowed:
+            for c, room in group_a:
+                self.place(c, b, room)
+            for c, room in group_b:
+                self.place(c, a, room)
+            if self.same_day_cost < before:
+                return True
+            for c, _ in group_a + group_b:
+                self.remove(c)
+        for c, room in group_a:
+            self.place(c, a, room)
+        for c, room in group_b:
+            self.place(c, b, room)
+        return False
+
+    def local_search(self, deadline: float) -> int:
+        iterations = 0
+        courses = len(self.sizes)
+        slot_count = len(self.blocked[0]) if courses else 0
+        while time.perf_counter() < deadline and courses and slot_count:
+            iterations += 1
+            unplaced = [c for c in range(courses) if self.slot_of[c] < 0]
+            if unplaced:
+                self.place_with_ejection(self.random.choice(unplaced))
+            elif self.same_day_cost == 0:
+                break
+            elif slot_count > 1 and self.random.random() < 0.2:
+                self.swap_slots(*self.random.sample(range(slot_count), 2))
+            else:
+                # Only courses with a same-day conflict can improve by moving
+                conflicted = [
+                    c for c in range(courses)
+                    if self.slot_of[c] >= 0 and self.day_weight[c][self.slot_day[self.slot_of[c]]]
+                ]
+                course = self.random.choice(conflicted)
+                if not self.improve_course(course):
+                    self.kempe_move(course, self.random.randrange(slot_count))
+        return iterations
+
+    def solve(self, time_budget: float) -> dict:
+        started = time.perf_counter()
+        self.dsatur()
+        constructed = {"unscheduled": self.unscheduled_count(), "same_day_conflicts": self.same_day_cost}
+        iterations = self.local_search(started + time_budget)
+        return {
+            "slot_of": list(self.slot_of),
+            "room_of": list(self.room_of),
+            "unscheduled": [c for c, slot in enumerate(self.slot_of) if slot < 0],
+            "same_day_conflicts": self.same_day_cost,
+            "construction": constructed,
+            "iterations": iterations,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
@@ -1,7 +1,7 @@
 import aio_pika
 import asyncio
-import json
 from app.config import RABBITMQ_URL, USER_PROFILE_QUEUE
+from app.rabbitmq.codec import decode, encode
 from app.controllers.user_controller import handle_message
 
 async def consume():
@@ -13,7 +13,7 @@ async def consume():
     async with queue.iterator() as queue_iter:
         async for message in queue_iter:
             async with message.process():
-                payload = json.loads(message.body.decode())
+                payload = decode(message.body, message.content_type)
 
                 # Process message
                 response = await handle_message(payload)
@@ -28,12 +28,14 @@ async def consume():
 
                 # Reply only if required
                 if reply_to and correlation_id:
+                    body, content_type = encode({
+                        "status": "success",
+                        "result": response
+                    }, message.content_type)
                     await channel.default_exchange.publish(
                         aio_pika.Message(
-                            body=json.dumps({
-                                "status": "success",
-                                "result": response
-                            }).encode(),
+                            body=body,
+                            content_type=content_type,
                             correlation_id=correlation_id
                         ),
                         routing_key=reply_to